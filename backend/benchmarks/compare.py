@@ -0,0 +1,52 @@
+"""
+Compare two benchmark artifacts written by ``benchmarks.run``.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = (
+    ('throughput_rps', lambda r: r['throughput_rps'], True),
+    ('p50_ms', lambda r: r['latency_ms']['p50'], False),
+    ('p95_ms', lambda r: r['latency_ms']['p95'], False),
+    ('p99_ms', lambda r: r['latency_ms']['p99'], False),
+    ('queries', lambda r: r['queries_per_request'] and r['queries_per_request']['mean'], False),
+)
+
+
+def change(before, after):
+    if not before:
+        return 'n/a'
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+
+    if before['meta'].get('volumes') != after['meta'].get('volumes'):
+        print("Warning: the runs used different data volumes")
+    if before['meta'].get('target') != after['meta'].get('target'):
+        print("Warning: the runs measured different targets (in-process and over HTTP are not comparable)")
+
+    print(f"{'scenario':16} {'metric':15} {'before':>10} {'after':>10} {'change':>8}")
+    for name in before['scenarios']:
+        if name not in after['scenarios']:
+            continue
+        for metric, value, higher_is_better in METRICS:
+            old, new = value(before['scenarios'][name]), value(after['scenarios'][name])
+            if old is None or new is None:
+                continue
+            print(f"{name:16} {metric:15} {old:>10} {new:>10} {change(old, new):>8}")
+
+
+if __name__ == '__main__':
+    main()
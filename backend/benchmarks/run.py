@@ -0,0 +1,311 @@
+"""
+Load benchmark for the REST API.
+
+By default this is an in-process microbenchmark: it creates a throwaway test
+database, seeds it (see ``benchmarks.seed``) and drives the real URL routes
+through Django's test client from a pool of threads. Every request passes the
+full middleware, authentication and serializer stack, and the queries each
+one runs are counted, but there is no server, socket or ASGI worker involved
+and the threads share one interpreter. Use it to compare code paths, not to
+estimate what a deployment can serve.
+
+With ``--url`` the same scenarios are sent over HTTP to a running server
+instead. The script then works on the configured database, which has to be
+the server's (it is seeded if it has no benchmark users yet), and signs its
+tokens with the configured SECRET_KEY, which has to match the server's too.
+Queries are not counted in that mode.
+
+Results are written as JSON; compare two runs with ``python -m benchmarks.compare``.
+Run from the backend directory:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --url http://localhost:8000 --output bench-http.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+import requests
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from compendium.models import Spell  # noqa: E402
+from encounters.models import Encounter  # noqa: E402
+from encounters.serializers import EncounterSerializer  # noqa: E402
+
+from .seed import USERNAME_PREFIX, seed  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+
+
+class Scenario:
+    """One route under test; ``request`` returns the response for a random user."""
+    name = None
+
+    def __init__(self, users, rng):
+        self.users = users
+        self.rng = rng
+        self.tokens = {user.id: f'Bearer {AccessToken.for_user(user)}' for user in users}
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': self.tokens[user.id]}
+
+    def request(self, client):
+        raise NotImplementedError
+
+
+class MonsterList(Scenario):
+    name = 'monster-list'
+
+    def request(self, client):
+        return client.get('/api/monsters/')
+
+
+class MonsterFilter(Scenario):
+    name = 'monster-filter'
+
+    def request(self, client):
+        cr_min = self.rng.randint(0, 20)
+        return client.get(f'/api/monsters/?cr_min={cr_min}&cr_max={cr_min + 3}&page_size=50')
+
+
+class SpellDetail(Scenario):
+    name = 'spell-detail'
+
+    def __init__(self, users, rng):
+        super().__init__(users, rng)
+        self.slugs = list(Spell.objects.values_list('slug', flat=True))
+
+    def request(self, client):
+        return client.get(f'/api/spells/{self.rng.choice(self.slugs)}/')
+
+
+class MyEncounters(Scenario):
+    name = 'my-encounters'
+
+    def request(self, client):
+        return client.get('/api/encounters/my_encounters/', **self.auth(self.rng.choice(self.users)))
+
+
+class EncounterUpdate(Scenario):
+    name = 'encounter-put'
+
+    def __init__(self, users, rng):
+        super().__init__(users, rng)
+        encounters = Encounter.objects.filter(user__in=users).prefetch_related(
+            'player_data__player_character', 'monster_data__monster'
+        )
+        self.bodies = [(encounter.id, encounter.user, EncounterSerializer(encounter).data) for encounter in encounters]
+
+    def request(self, client):
+        encounter_id, user, body = self.rng.choice(self.bodies)
+        body = dict(body, monster_data=[
+            dict(monster, current_hp=max((monster['current_hp'] or 0) - self.rng.randint(0, 5), 0))
+            for monster in body['monster_data']
+        ])
+        return client.put(
+            f'/api/encounters/{encounter_id}/', json.dumps(body), content_type='application/json',
+            **self.auth(user),
+        )
+
+
+SCENARIOS = [MonsterList, MonsterFilter, SpellDetail, MyEncounters, EncounterUpdate]
+
+
+class HTTPClient:
+    """
+    Sends scenario requests to a running server, taking the same arguments as
+    the subset of django.test.Client the scenarios use.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    @staticmethod
+    def headers(extra, content_type=None):
+        # The test client takes headers as WSGI environ keys, e.g. HTTP_AUTHORIZATION
+        headers = {
+            key.removeprefix('HTTP_').replace('_', '-').title(): value
+            for key, value in extra.items() if key.startswith('HTTP_')
+        }
+        if content_type:
+            headers['Content-Type'] = content_type
+        return headers
+
+    def get(self, path, **extra):
+        return self.session.get(self.base_url + path, headers=self.headers(extra))
+
+    def put(self, path, data, content_type, **extra):
+        return self.session.put(self.base_url + path, data=data, headers=self.headers(extra, content_type))
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(scenario, count, concurrency, warmup, base_url=None):
+    samples = []
+    errors = []
+    lock = threading.Lock()
+    remaining = iter(range(warmup + count))
+
+    def worker():
+        client = HTTPClient(base_url) if base_url else Client()
+        counter = QueryCounter()
+        try:
+            with connection.execute_wrapper(counter):
+                while True:
+                    with lock:
+                        index = next(remaining, None)
+                    if index is None:
+                        return
+                    counter.count = 0
+                    started = time.perf_counter()
+                    response = scenario.request(client)
+                    elapsed = time.perf_counter() - started
+                    if index < warmup:
+                        continue
+                    with lock:
+                        samples.append((elapsed, counter.count))
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    duration = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _ in samples)
+    queries = [count for _, count in samples]
+    return {
+        'requests': len(samples),
+        'errors': len(errors),
+        'duration_s': round(duration, 4),
+        'throughput_rps': round(len(samples) / duration, 2),
+        'latency_ms': {
+            **{f'p{p}': round(percentile(latencies, p) * 1000, 3) for p in PERCENTILES},
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3),
+        },
+        # Queries run in the server process over HTTP, where they cannot be counted
+        'queries_per_request': None if base_url else {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='bench.json', help='Where to write the JSON results')
+    parser.add_argument('--requests', type=int, default=500, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='Number of client threads')
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help='Only run these scenarios (repeatable)')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--characters-per-user', type=int, default=5)
+    parser.add_argument('--encounters-per-user', type=int, default=10)
+    parser.add_argument('--monsters-per-encounter', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0, help='Seed for data generation and request choice')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs')
+    parser.add_argument('--url', help='Benchmark the server running at this URL over HTTP instead of in-process')
+    args = parser.parse_args()
+
+    volumes = {
+        'users': args.users,
+        'characters_per_user': args.characters_per_user,
+        'encounters_per_user': args.encounters_per_user,
+        'monsters_per_encounter': args.monsters_per_encounter,
+    }
+    in_process = not args.url
+    if in_process:
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+        seeded = args.keepdb and Encounter.objects.exists()
+    else:
+        # The server's own database; earlier runs' users are reused
+        seeded = User.objects.filter(username__startswith=USERNAME_PREFIX).exists()
+    try:
+        if not seeded:
+            seed(**volumes, seed=args.seed)
+        users = list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id'))
+
+        results = {}
+        for scenario_class in SCENARIOS:
+            if args.scenario and scenario_class.name not in args.scenario:
+                continue
+            scenario = scenario_class(users, random.Random(args.seed))
+            result = results[scenario_class.name] = run_scenario(
+                scenario, args.requests, args.concurrency, args.warmup, base_url=args.url
+            )
+            queries = result['queries_per_request']
+            print(f"{scenario_class.name:16} {result['throughput_rps']:>8} req/s  "
+                  f"p50 {result['latency_ms']['p50']:>8} ms  p99 {result['latency_ms']['p99']:>8} ms"
+                  + (f"  {queries['mean']:>6} queries/request" if queries else ''))
+    finally:
+        connections.close_all()
+        if in_process:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    artifact = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'target': args.url or 'in-process',
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'volumes': volumes,
+        },
+        'scenarios': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(artifact, output, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Seed a database with benchmark users, characters, encounters and the bundled compendium."""
+import io
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from compendium.loaders import MonsterLoader, SpellLoader
+
+RESOURCES = settings.BASE_DIR / 'resources'
+USERNAME_PREFIX = 'bench'
+
+
+def load_compendium():
+    MonsterLoader(RESOURCES / 'dnd_monsters.csv', rejects_path=os.devnull, sync=True).run()
+    SpellLoader(RESOURCES / 'dnd-spells.csv', rejects_path=os.devnull, sync=True).run()
+
+
+def seed(users=20, characters_per_user=5, encounters_per_user=10, monsters_per_encounter=8, seed=0):
+    """Create benchmark users and their data with ``generate_synthetic_data``; returns the users."""
+    load_compendium()
+    call_command(
+        'generate_synthetic_data',
+        users=users,
+        characters_per_user=characters_per_user,
+        encounters_per_user=encounters_per_user,
+        players_per_encounter=characters_per_user,
+        monsters_per_encounter=monsters_per_encounter,
+        seed=seed,
+        prefix=USERNAME_PREFIX,
+        stdout=io.StringIO(),
+    )
+    return list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id'))
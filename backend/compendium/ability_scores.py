@@ -0,0 +1,22 @@
+# Monster ability score fields, paired with the column names dnd_monsters.csv uses for them
+ABILITY_SCORES = {
+    'strength': 'str',
+    'dexterity': 'dex',
+    'constitution': 'con',
+    'intelligence': 'int',
+    'wisdom': 'wis',
+    'charisma': 'cha',
+}
+
+MONSTER_SIZES = ('Tiny', 'Small', 'Medium', 'Large', 'Huge', 'Gargantuan')
+
+
+def ability_modifier(score):
+    """The modifier of an ability score (10-11 is +0, 8-9 is -1, 12-13 is +1), or None without a score."""
+    if score is None:
+        return None
+    return (score - 10) // 2
+
+
+def modifier_field(ability):
+    return f'{ability}_modifier'
@@ -5,9 +5,9 @@ from .models import Monster, Spell
 
 @admin.register(Monster)
 class MonsterAdmin(admin.ModelAdmin):
-    list_display = ("name", "cr", "type", "ac", "hp")
+    list_display = ("name", "cr", "xp", "type", "size", "ac", "hp", "legendary", "source")
     search_fields = ("name", "type", "cr")
-    list_filter = ("type", "cr")
+    list_filter = ("type", "cr", "size", "legendary", "source")
 
 
 @admin.register(Spell)
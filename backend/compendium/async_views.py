@@ -0,0 +1,42 @@
+from django.http import HttpResponse
+from rest_framework import status
+
+from config.async_views import with_async_reads
+
+from .caching import aget_payload, payload_cache_key
+from .mixins import add_compendium_cache_headers, compendium_etag, etag_matches, payload_response
+from .versioning import aget_compendium_version
+from .views import MonsterViewSet, SpellViewSet
+
+
+async def cached_compendium_read(request, renderer_format, *args, **kwargs):
+    """
+    Answer a compendium read from the ETag or the payload cache, the same way
+    ConditionalCompendiumMixin does, or return None on a miss.
+    """
+    version = await aget_compendium_version()
+    etag = compendium_etag(version, renderer_format)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag_matches(if_none_match, etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    elif renderer_format == 'json':
+        payload = await aget_payload(payload_cache_key(request.path, request.GET, version))
+        if payload is None:
+            return None
+        response = payload_response(payload)
+    else:
+        return None
+    return add_compendium_cache_headers(response, etag)
+
+
+def async_compendium_view(viewset, actions, **initkwargs):
+    return with_async_reads(viewset.as_view(actions, **initkwargs), cached_compendium_read)
+
+
+monster_list = async_compendium_view(MonsterViewSet, {'get': 'list'})
+monster_detail = async_compendium_view(MonsterViewSet, {'get': 'retrieve'})
+spell_list = async_compendium_view(SpellViewSet, {'get': 'list'})
+spell_detail = async_compendium_view(SpellViewSet, {'get': 'retrieve'})
+# Extra actions get their options (the search pagination) as init kwargs, like the router passes them
+spell_search = async_compendium_view(SpellViewSet, {'get': 'search'}, **SpellViewSet.search.kwargs)
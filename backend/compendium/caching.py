@@ -0,0 +1,63 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import QueryDict
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from .models import Monster, Spell
+from .serializers import MonsterSerializer, SpellSerializer
+from .versioning import get_compendium_version
+
+PAYLOAD_KEY_PREFIX = 'compendium:payload'
+# Backends whose entries are only seen by the process that wrote them
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_payload_cache():
+    return caches[settings.COMPENDIUM_PAYLOAD_CACHE]
+
+
+def payload_cache_key(path, query_params, version):
+    """
+    Key for a rendered JSON compendium response. The compendium version is part
+    of the key, so bumping it invalidates every stored payload at once.
+    """
+    query = urlencode(sorted((key, value) for key in query_params for value in query_params.getlist(key)))
+    digest = hashlib.sha256(f"{path}?{query}".encode()).hexdigest()
+    return f"{PAYLOAD_KEY_PREFIX}:{version}:{digest}"
+
+
+def payload_cache_is_shared():
+    """False if payloads stored here never reach other processes, such as the web workers."""
+    return not isinstance(get_payload_cache(), PROCESS_LOCAL_CACHES)
+
+
+def get_payload(key):
+    return get_payload_cache().get(key)
+
+
+async def aget_payload(key):
+    return await get_payload_cache().aget(key)
+
+
+def store_payload(key, content_type, content):
+    get_payload_cache().set(key, (content_type, content), settings.COMPENDIUM_PAYLOAD_CACHE_TIMEOUT)
+
+
+def warm_compendium_cache():
+    """Render and store the unfiltered monster and spell lists for the current version."""
+    version = get_compendium_version()
+    renderer = JSONRenderer()
+    lists = (
+        ('monster-list', MonsterSerializer, Monster.objects.order_by('name', 'id')),
+        ('spell-list', SpellSerializer, Spell.objects.order_by('name', 'id')),
+    )
+    for url_name, serializer_class, queryset in lists:
+        content = renderer.render(serializer_class(queryset, many=True).data, renderer.media_type)
+        store_payload(payload_cache_key(reverse(url_name), QueryDict(), version), renderer.media_type, content)
+    return version
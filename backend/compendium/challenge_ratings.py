@@ -0,0 +1,29 @@
+from fractions import Fraction
+
+# Challenge ratings as stored in Monster.cr, mapped to their numeric value
+CR_VALUES = {
+    "0": 0.0, "1/8": 0.125, "1/4": 0.25, "1/2": 0.5,
+    **{str(cr): float(cr) for cr in range(1, 31)},
+}
+
+# Experience points awarded for a monster of each challenge rating
+CR_XP = {
+    "0": 10, "1/8": 25, "1/4": 50, "1/2": 100, "1": 200, "2": 450, "3": 700, "4": 1100,
+    "5": 1800, "6": 2300, "7": 2900, "8": 3900, "9": 5000, "10": 5900, "11": 7200, "12": 8400,
+    "13": 10000, "14": 11500, "15": 13000, "16": 15000, "17": 18000, "18": 20000, "19": 22000,
+    "20": 24000, "21": 28000, "22": 33000, "23": 41000, "24": 50000, "25": 62000, "26": 75000,
+    "27": 90000, "28": 105000, "29": 120000, "30": 155000,
+}
+
+
+def parse_cr(value):
+    """Parse a challenge rating like "1/4", "0.25" or "5" into a float, or None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return float(Fraction(value))
+    except (ValueError, ZeroDivisionError):
+        return None
@@ -0,0 +1,199 @@
+from django.db.models import Q
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from .ability_scores import ABILITY_SCORES, MONSTER_SIZES
+from .challenge_ratings import parse_cr
+from .spell_mechanics import ABILITIES
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: [f"Expected an integer, got '{value}'."]})
+
+
+def _cr_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    cr = parse_cr(value)
+    if cr is None:
+        raise ValidationError({name: [f"Expected a challenge rating, got '{value}'."]})
+    return cr
+
+
+def _bool_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    if value in ('true', '1'):
+        return True
+    if value in ('false', '0'):
+        return False
+    raise ValidationError({name: [f"Expected true or false, got '{value}'."]})
+
+
+def _list_param(params, name):
+    return [item.strip() for item in params.get(name, '').split(',') if item.strip()]
+
+
+def _range_filter(queryset, params, field, param=None, parse=_int_param):
+    param = param or field
+    lower = parse(params, f'{param}_min')
+    upper = parse(params, f'{param}_max')
+    if lower is not None:
+        queryset = queryset.filter(**{f'{field}__gte': lower})
+    if upper is not None:
+        queryset = queryset.filter(**{f'{field}__lte': upper})
+    return queryset
+
+
+def _starts_with_any(queryset, field, prefixes):
+    query = Q()
+    for prefix in prefixes:
+        query |= Q(**{f'{field}__istartswith': prefix})
+    return queryset.filter(query)
+
+
+class MonsterFilter(filters.BaseFilterBackend):
+    """
+    Filters monsters by ?name=, ?type=, ?cr=, ?cr_min=/?cr_max=,
+    ?xp_min=/?xp_max=, ?ac_min=/?ac_max= and ?hp_min=/?hp_max=, and by stat
+    block: ?size=, ?source=, ?legendary=, ?speed=, ?alignment= and ability
+    score ranges such as ?str_min=/?str_max= or ?wis_min=.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        name = params.get('name')
+        if name:
+            queryset = queryset.filter(name__icontains=name)
+
+        types = _list_param(params, 'type')
+        if types:
+            # Types look like "humanoid (aarakocra)", so match on the leading word
+            queryset = _starts_with_any(queryset, 'type', types)
+
+        crs = _list_param(params, 'cr')
+        if crs:
+            queryset = queryset.filter(cr__in=crs)
+
+        queryset = _range_filter(queryset, params, 'cr_value', param='cr', parse=_cr_param)
+        queryset = _range_filter(queryset, params, 'xp')
+        queryset = _range_filter(queryset, params, 'ac')
+        queryset = _range_filter(queryset, params, 'hp')
+
+        sizes = _list_param(params, 'size')
+        if sizes:
+            sizes = [size.title() for size in sizes]
+            unknown = [size for size in sizes if size not in MONSTER_SIZES]
+            if unknown:
+                expected = ', '.join(MONSTER_SIZES)
+                raise ValidationError({'size': [f"Expected one of {expected}, got '{unknown[0]}'."]})
+            queryset = queryset.filter(size__in=sizes)
+
+        sources = _list_param(params, 'source')
+        if sources:
+            # Sources look like "Monster Manual (SRD)", so "Monster Manual" matches every printing
+            queryset = _starts_with_any(queryset, 'source', sources)
+
+        legendary = _bool_param(params, 'legendary')
+        if legendary is not None:
+            queryset = queryset.filter(legendary=legendary)
+
+        speed = params.get('speed')
+        if speed:
+            queryset = queryset.filter(speed__icontains=speed)
+
+        alignments = _list_param(params, 'alignment')
+        if alignments:
+            queryset = queryset.filter(alignment__in=[alignment.lower() for alignment in alignments])
+
+        for ability, abbreviation in ABILITY_SCORES.items():
+            queryset = _range_filter(queryset, params, ability, param=abbreviation)
+        return queryset
+
+
+class SpellFilter(filters.BaseFilterBackend):
+    """
+    Filters spells by ?name=, ?school=, ?level=, ?level_min=/?level_max=
+    and ?class=, and by extracted mechanics: ?damage_type=, ?save=,
+    ?area_shape=, ?area_size_min=/?area_size_max= and ?scales=.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        name = params.get('name')
+        if name:
+            queryset = queryset.filter(name__icontains=name)
+
+        schools = _list_param(params, 'school')
+        if schools:
+            queryset = queryset.filter(school__in=[school.title() for school in schools])
+
+        levels = _list_param(params, 'level')
+        if levels:
+            try:
+                queryset = queryset.filter(level__in=[int(level) for level in levels])
+            except ValueError:
+                raise ValidationError({'level': ["Expected a comma separated list of integers."]})
+
+        queryset = _range_filter(queryset, params, 'level')
+
+        for spell_class in _list_param(params, 'class'):
+            queryset = queryset.filter(classes__contains=[spell_class.title()])
+
+        damage_types = _list_param(params, 'damage_type')
+        if damage_types:
+            queryset = queryset.filter(damage_types__overlap=[value.lower() for value in damage_types])
+
+        saves = _list_param(params, 'save')
+        if saves:
+            # Accept full ability names as well as abbreviations like "dex"
+            matches = {
+                save: [ability for ability in ABILITIES if ability.lower().startswith(save.lower())]
+                for save in saves
+            }
+            unknown = [save for save, abilities in matches.items() if not abilities]
+            if unknown:
+                expected = ', '.join(ABILITIES)
+                raise ValidationError({'save': [f"Expected one of {expected}, got '{unknown[0]}'."]})
+            queryset = queryset.filter(save_ability__in=[ability for abilities in matches.values() for ability in abilities])
+
+        shapes = _list_param(params, 'area_shape')
+        if shapes:
+            queryset = queryset.filter(area_shape__in=[shape.lower() for shape in shapes])
+
+        queryset = _range_filter(queryset, params, 'area_size')
+
+        scales = _bool_param(params, 'scales')
+        if scales is True:
+            queryset = queryset.exclude(scaling_dice='')
+        elif scales is False:
+            queryset = queryset.filter(scaling_dice='')
+        return queryset
+
+
+class CompendiumOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that always ends on ``id`` so keyset pages are stable, and
+    that maps public names to columns through the view's ``ordering_aliases``.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        aliases = getattr(view, 'ordering_aliases', {})
+        ordering = []
+        for field in super().get_ordering(request, queryset, view) or []:
+            descending = field.startswith('-')
+            column = aliases.get(field.lstrip('-'), field.lstrip('-'))
+            ordering.append(f"-{column}" if descending else column)
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering.append('id')
+        return ordering
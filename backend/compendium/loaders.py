@@ -0,0 +1,271 @@
+import time
+
+import pandas as pd
+from django.db import models, transaction
+from django.utils.text import slugify
+
+from .ability_scores import ABILITY_SCORES, modifier_field
+from .challenge_ratings import CR_VALUES, CR_XP
+from .models import Monster, Spell
+from .spell_mechanics import extract_mechanics
+from .versioning import bump_compendium_version
+
+
+class LoadResult:
+    def __init__(self):
+        self.inserted = []
+        self.updated = []
+        self.unchanged = 0
+        self.deleted = []
+        self.kept = []
+        self.rejected = 0
+        self.seconds = 0.0
+
+    @property
+    def total(self):
+        return len(self.inserted) + len(self.updated) + self.unchanged + self.rejected
+
+
+class CompendiumLoader:
+    """
+    Streams a compendium CSV in chunks and upserts it in a single transaction.
+
+    Subclasses describe how to turn a raw chunk into model field columns in
+    ``prepare`` and flag bad rows through ``reject``; rows that fail validation
+    are written to a reject file instead of aborting the load.
+
+    In ``sync`` mode each row's content hash is compared with the stored one and
+    only new or changed rows are written; ``delete_missing`` additionally removes
+    rows that are no longer in the file.
+    """
+    model = None
+    key_field = None
+    required_columns = ()
+    excluded_fields = ()
+
+    def __init__(self, file_path, chunk_size=500, rejects_path=None, sync=False, delete_missing=False):
+        self.file_path = str(file_path)
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path or f"{self.file_path}.rejected.csv"
+        self.sync = sync
+        self.delete_missing = delete_missing
+        self.rejected_frames = []
+        self.seen_keys = set()
+        self.rejected_keys = set()
+
+    @property
+    def update_fields(self):
+        return [
+            field.name for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.name != self.key_field
+            and field.name not in self.excluded_fields
+        ]
+
+    def prepare(self, chunk):
+        """Return a frame with one column per model field, indexed like ``chunk``."""
+        raise NotImplementedError
+
+    def after_write(self, keys):
+        """Hook run after each chunk is written, with the chunk's key values."""
+
+    def deletable(self, queryset):
+        """Narrow down rows missing from the file to the ones that may be deleted."""
+        return queryset
+
+    def run(self):
+        result = LoadResult()
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            stored_hashes = dict(self.model.objects.values_list(self.key_field, 'content_hash'))
+
+            for chunk in pd.read_csv(self.file_path, chunksize=self.chunk_size):
+                missing = set(self.required_columns) - set(chunk.columns)
+                if missing:
+                    raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+                chunk['_reason'] = pd.Series(pd.NA, index=chunk.index, dtype='object')
+                frame = self.prepare(chunk)
+                self.check_lengths(chunk, frame)
+                self.check_duplicates(chunk, frame)
+
+                bad = chunk['_reason'].notna()
+                if bad.any():
+                    self.rejected_frames.append(
+                        chunk.loc[bad].rename(columns={'_reason': 'reject_reason'})
+                    )
+                    result.rejected += int(bad.sum())
+                    self.rejected_keys.update(frame.loc[bad, self.key_field])
+
+                rows = frame.loc[~bad].to_dict('records')
+                for row in rows:
+                    row['content_hash'] = self.model.hash_content(row)
+                self.seen_keys.update(row[self.key_field] for row in rows)
+
+                if self.sync:
+                    changed = [
+                        row for row in rows
+                        if stored_hashes.get(row[self.key_field]) != row['content_hash']
+                    ]
+                    result.unchanged += len(rows) - len(changed)
+                    rows = changed
+                if not rows:
+                    continue
+
+                self.model.objects.bulk_create(
+                    [self.model(**row) for row in rows],
+                    batch_size=self.chunk_size,
+                    update_conflicts=True,
+                    unique_fields=[self.key_field],
+                    update_fields=self.update_fields,
+                )
+                keys = [row[self.key_field] for row in rows]
+                self.after_write(keys)
+                for key in keys:
+                    (result.updated if key in stored_hashes else result.inserted).append(key)
+
+            if self.delete_missing:
+                # Keys of rejected rows are still in the file, so they are not treated as vanished
+                vanished = set(stored_hashes) - self.seen_keys - self.rejected_keys
+                candidates = self.model.objects.filter(**{f'{self.key_field}__in': vanished})
+                deletable = self.deletable(candidates)
+                result.deleted = sorted(deletable.values_list(self.key_field, flat=True))
+                result.kept = sorted(vanished - set(result.deleted))
+                deletable.delete()
+
+            if result.inserted or result.updated or result.deleted:
+                bump_compendium_version()
+
+        if self.rejected_frames:
+            pd.concat(self.rejected_frames).to_csv(self.rejects_path, index=False)
+
+        result.seconds = time.perf_counter() - started
+        return result
+
+    @staticmethod
+    def reject(chunk, mask, reason):
+        """Flag rows matching ``mask`` with ``reason``, keeping the first reason per row."""
+        chunk.loc[mask & chunk['_reason'].isna(), '_reason'] = reason
+
+    def check_lengths(self, chunk, frame):
+        for field in self.model._meta.concrete_fields:
+            max_length = getattr(field, 'max_length', None)
+            if max_length and field.name in frame and isinstance(field, models.CharField):
+                too_long = frame[field.name].fillna('').astype(str).str.len() > max_length
+                self.reject(chunk, too_long, f"{field.name} longer than {max_length} characters")
+
+    def check_duplicates(self, chunk, frame):
+        keys = frame[self.key_field]
+        duplicated = keys.duplicated() | keys.isin(self.seen_keys)
+        self.reject(chunk, duplicated, f"duplicate {self.key_field}")
+
+
+def _text(column):
+    return column.fillna('').astype(str).str.strip()
+
+
+def _nullable(column):
+    """Turn a nullable integer column into Python ints and None, which the database driver accepts."""
+    return column.astype(object).where(column.notna(), None)
+
+
+def _integer(chunk, column, loader):
+    values = pd.to_numeric(chunk[column], errors='coerce')
+    loader.reject(chunk, values.isna(), f"{column} is not a number")
+    return values.fillna(0).astype(int)
+
+
+class MonsterLoader(CompendiumLoader):
+    model = Monster
+    key_field = 'name'
+    required_columns = (
+        'name', 'url', 'cr', 'type', 'ac', 'hp', 'size', 'speed', 'align', 'legendary', 'source',
+        *ABILITY_SCORES.values(),
+    )
+
+    def deletable(self, queryset):
+        # Monsters used in encounters are protected, so they stay until those encounters go
+        return queryset.filter(encounter_data__isnull=True)
+
+    def prepare(self, chunk):
+        name = _text(chunk['name'])
+        cr = _text(chunk['cr'])
+        self.reject(chunk, name == '', "name is missing")
+        self.reject(chunk, ~cr.isin(list(CR_VALUES)), "cr is not a valid challenge rating")
+
+        abilities = {}
+        for ability, column in ABILITY_SCORES.items():
+            # Blank scores stay NULL; anything else has to be a score between 1 and 30
+            scores = pd.to_numeric(chunk[column], errors='coerce')
+            valid = scores.between(1, 30) & (scores % 1 == 0)
+            self.reject(chunk, chunk[column].notna() & ~valid, f"{column} is not an ability score")
+            scores = scores.where(valid).astype('Int64')
+            abilities[ability] = _nullable(scores)
+            # Same as ability_modifier, vectorized
+            abilities[modifier_field(ability)] = _nullable((scores - 10) // 2)
+
+        return pd.DataFrame({
+            'name': name,
+            'url': _text(chunk['url']),
+            'cr': cr,
+            'cr_value': cr.map(CR_VALUES),
+            'xp': cr.map(CR_XP).astype('Int64'),
+            'type': _text(chunk['type']),
+            'ac': _integer(chunk, 'ac', self),
+            'hp': _integer(chunk, 'hp', self),
+            'size': _text(chunk['size']).str.title(),
+            'speed': _text(chunk['speed']),
+            'alignment': _text(chunk['align']),
+            'legendary': _text(chunk['legendary']).str.lower() == 'legendary',
+            'source': _text(chunk['source']),
+            **abilities,
+        }, index=chunk.index)
+
+
+class SpellLoader(CompendiumLoader):
+    model = Spell
+    key_field = 'slug'
+    required_columns = (
+        'name', 'classes', 'level', 'school', 'cast_time', 'range', 'duration',
+        'verbal', 'somatic', 'material', 'material_cost', 'description',
+    )
+    excluded_fields = ('search_vector',)
+
+    def prepare(self, chunk):
+        name = _text(chunk['name'])
+        slug = name.map(slugify)
+        level = _integer(chunk, 'level', self)
+        self.reject(chunk, slug == '', "name is missing")
+        self.reject(chunk, ~level.between(0, 9), "level must be between 0 and 9")
+
+        classes = _text(chunk['classes']).map(
+            lambda value: [cls.strip() for cls in value.split(',') if cls.strip()]
+        )
+        components = {
+            column: pd.to_numeric(chunk[column], errors='coerce').fillna(0).astype(bool)
+            for column in ('verbal', 'somatic', 'material')
+        }
+        material_cost = chunk['material_cost'].astype(object).where(chunk['material_cost'].notna(), None)
+        description = _text(chunk['description'])
+
+        # Mechanics are derived from the description; the hash covers them through MECHANICS_VERSION
+        mechanics = pd.DataFrame(description.map(extract_mechanics).tolist(), index=chunk.index)
+        mechanics['area_size'] = _nullable(mechanics['area_size'].astype('Int64'))
+
+        return pd.DataFrame({
+            'name': name,
+            'slug': slug,
+            'classes': classes,
+            'level': level,
+            'school': _text(chunk['school']),
+            'cast_time': _text(chunk['cast_time']),
+            'range': _text(chunk['range']),
+            'duration': _text(chunk['duration']),
+            **components,
+            'material_cost': material_cost,
+            'description': description,
+            **mechanics,
+        }, index=chunk.index)
+
+    def after_write(self, keys):
+        Spell.objects.filter(slug__in=keys).update_search_vector()
@@ -0,0 +1,100 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from compendium.caching import payload_cache_is_shared, warm_compendium_cache
+
+
+def warm_payload_cache(command):
+    """
+    Warm the payload cache after the compendium changed, if the web workers
+    can see it. A process-local cache would be thrown away with the command.
+    """
+    if not payload_cache_is_shared():
+        command.stdout.write(
+            f"Skipped warming the compendium payload cache: the '{settings.COMPENDIUM_PAYLOAD_CACHE}' "
+            f"cache is local to this process. Point CACHE_BACKEND at a shared cache to warm it from here"
+        )
+        return
+    version = warm_compendium_cache()
+    command.stdout.write(f"Warmed compendium payload cache for version {version}")
+
+
+class LoaderCommand(BaseCommand):
+    """Shared CLI for the CSV loaders in ``compendium.loaders``."""
+    loader_class = None
+    label = 'rows'
+    file_help = 'Path to the local CSV file'
+    loading_message = "Loading dataset..."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file_path',
+            type=str,
+            help=self.file_help
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=500,
+            help='Number of CSV rows read and written per batch'
+        )
+        parser.add_argument(
+            '--rejects_path',
+            type=str,
+            help='Where to write rows that fail validation (default: <file_path>.rejected.csv)'
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Only write rows whose content hash differs from the stored one'
+        )
+        parser.add_argument(
+            '--delete_missing',
+            action='store_true',
+            help='Delete stored rows that are no longer present in the file'
+        )
+
+    def handle(self, *args, **options):
+        file_path = options.get('file_path')
+
+        if not file_path or not os.path.exists(file_path):
+            self.stderr.write(self.style.ERROR(f"File not found: {file_path}"))
+            return
+
+        self.stdout.write(self.loading_message)
+
+        loader = self.loader_class(
+            file_path,
+            chunk_size=options['chunk_size'],
+            rejects_path=options.get('rejects_path'),
+            sync=options['sync'],
+            delete_missing=options['delete_missing'],
+        )
+        try:
+            result = loader.run()
+        except (ValueError, DatabaseError) as e:
+            self.stderr.write(self.style.ERROR(f"Failed to load CSV, no changes were saved: {e}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result.total} {self.label} in {result.seconds:.2f}s: "
+            f"{len(result.inserted)} inserted, {len(result.updated)} updated, "
+            f"{result.unchanged} unchanged, {len(result.deleted)} deleted, {result.rejected} rejected"
+        ))
+        if options['verbosity'] > 1:
+            for action, keys in (('Inserted', result.inserted), ('Updated', result.updated),
+                                 ('Deleted', result.deleted)):
+                for key in keys:
+                    self.stdout.write(f"  {action}: {key}")
+        if result.kept:
+            self.stdout.write(self.style.WARNING(
+                f"Kept {len(result.kept)} {self.label} missing from the file because encounters use them: "
+                f"{', '.join(result.kept)}"
+            ))
+        if result.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected rows written to {loader.rejects_path}"))
+
+        warm_payload_cache(self)
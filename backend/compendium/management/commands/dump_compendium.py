@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from compendium.snapshot import dump_snapshot
+
+DEFAULT_SNAPSHOT = settings.BASE_DIR / 'resources' / 'compendium.snapshot.gz'
+
+
+class Command(BaseCommand):
+    help = 'Write every monster and spell into a compressed snapshot for restore_compendium'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file_path',
+            type=str,
+            default=str(DEFAULT_SNAPSHOT),
+            help='Where to write the snapshot'
+        )
+        parser.add_argument(
+            '--compression_level',
+            type=int,
+            default=6,
+            choices=range(1, 10),
+            help='gzip level from 1 (fastest) to 9 (smallest)'
+        )
+
+    def handle(self, *args, **options):
+        file_path = options['file_path']
+        header = dump_snapshot(file_path, compresslevel=options['compression_level'])
+        counts = ', '.join(f"{table['rows']} {table['model']}" for table in header['tables'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {counts} to {file_path} ({os.path.getsize(file_path) / 1024:.0f} KiB, "
+            f"schema {header['schema']}, compendium version {header['compendium_version']})"
+        ))
@@ -0,0 +1,41 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from compendium.management.base import warm_payload_cache
+from compendium.management.commands.dump_compendium import DEFAULT_SNAPSHOT
+from compendium.snapshot import SnapshotError, restore_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Load monsters and spells from a snapshot written by dump_compendium'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file_path',
+            type=str,
+            default=str(DEFAULT_SNAPSHOT),
+            help='Path to the snapshot file'
+        )
+
+    def handle(self, *args, **options):
+        file_path = options.get('file_path')
+
+        if not file_path or not os.path.exists(file_path):
+            self.stderr.write(self.style.ERROR(f"File not found: {file_path}"))
+            return
+
+        try:
+            result = restore_snapshot(file_path)
+        except (SnapshotError, DatabaseError) as e:
+            self.stderr.write(self.style.ERROR(f"Failed to restore snapshot, no changes were saved: {e}"))
+            return
+
+        counts = ', '.join(
+            f"{result.written[table['model']]} of {table['rows']} {table['model']}"
+            for table in result.header['tables']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Restored {counts} in {result.seconds:.2f}s"))
+
+        warm_payload_cache(self)
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0006_spell_slug'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['name'], name='monster_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['type'], name='monster_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['cr'], name='monster_cr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['ac'], name='monster_ac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['hp'], name='monster_hp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=models.Index(fields=['name'], name='spell_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=models.Index(fields=['level'], name='spell_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=models.Index(fields=['school'], name='spell_school_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def populate_search_vector(apps, schema_editor):
+    Spell = apps.get_model('compendium', 'Spell')
+    Spell.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('school', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0007_monster_spell_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spell',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='spell_search_vector_idx'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """
+    Keep the oldest monster of each name and point encounters at it before the
+    unique constraint goes on. The loaders upsert by name from here on, so the
+    next load brings the kept row up to date with the CSV.
+    """
+    Monster = apps.get_model('compendium', 'Monster')
+    MonsterEncounterData = apps.get_model('encounters', 'MonsterEncounterData')
+    duplicated = (
+        Monster.objects.values('name').annotate(count=Count('id'), keep=Min('id')).filter(count__gt=1)
+    )
+    for duplicate in duplicated:
+        extra = Monster.objects.filter(name=duplicate['name']).exclude(id=duplicate['keep'])
+        MonsterEncounterData.objects.filter(monster__in=extra).update(monster_id=duplicate['keep'])
+        extra.delete()
+    # Run the deferred foreign key checks now; PostgreSQL will not alter a table with pending ones
+    schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0008_spell_search_vector'),
+        # Encounters reference monsters and have to follow the merged rows
+        ('encounters', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='monster',
+            name='monster_name_idx',
+        ),
+        migrations.AlterField(
+            model_name='monster',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
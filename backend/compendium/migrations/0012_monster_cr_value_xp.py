@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+# Frozen copy of compendium.challenge_ratings as it was when this migration was
+# written, so later edits to that module cannot change what it does
+CR_VALUES = {
+    "0": 0.0, "1/8": 0.125, "1/4": 0.25, "1/2": 0.5,
+    **{str(cr): float(cr) for cr in range(1, 31)},
+}
+
+CR_XP = {
+    "0": 10, "1/8": 25, "1/4": 50, "1/2": 100, "1": 200, "2": 450, "3": 700, "4": 1100,
+    "5": 1800, "6": 2300, "7": 2900, "8": 3900, "9": 5000, "10": 5900, "11": 7200, "12": 8400,
+    "13": 10000, "14": 11500, "15": 13000, "16": 15000, "17": 18000, "18": 20000, "19": 22000,
+    "20": 24000, "21": 28000, "22": 33000, "23": 41000, "24": 50000, "25": 62000, "26": 75000,
+    "27": 90000, "28": 105000, "29": 120000, "30": 155000,
+}
+
+
+def populate_cr_value_xp(apps, schema_editor):
+    Monster = apps.get_model('compendium', 'Monster')
+    for cr, value in CR_VALUES.items():
+        Monster.objects.filter(cr=cr).update(cr_value=value, xp=CR_XP[cr])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0011_compendium_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monster',
+            name='cr_value',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='xp',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['cr_value'], name='monster_cr_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['xp'], name='monster_xp_idx'),
+        ),
+        migrations.RunPython(populate_cr_value_xp, migrations.RunPython.noop),
+    ]
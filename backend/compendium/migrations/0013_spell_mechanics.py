@@ -0,0 +1,128 @@
+import re
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# Frozen copy of compendium.spell_mechanics as it was when this migration was
+# written, so later changes to the extraction cannot change what it does
+DAMAGE_TYPES = (
+    'acid', 'bludgeoning', 'cold', 'fire', 'force', 'lightning', 'necrotic',
+    'piercing', 'poison', 'psychic', 'radiant', 'slashing', 'thunder',
+)
+ABILITIES = ('Strength', 'Dexterity', 'Constitution', 'Intelligence', 'Wisdom', 'Charisma')
+
+HIGHER_LEVELS = re.compile(r'\n\s*At Higher Levels\.?', re.IGNORECASE)
+DAMAGE = re.compile(
+    rf"(\d+d\d+)(?:\s*\+\s*[\w ]+?)?\s+({'|'.join(DAMAGE_TYPES)})\s+damage", re.IGNORECASE
+)
+SAVE = re.compile(rf"({'|'.join(ABILITIES)}) saving throw")
+# "60-foot cone", "20-foot-radius sphere", "10-foot radius, 40-foot-high cylinder", "10-foot radius"
+AREA = re.compile(
+    r"(\d+)[- ]foot(?:[- ]radius)?(?:,? \d+[- ]foot[- ]high)?[- ](cone|cube|cylinder|line|sphere|square)"
+    r"|(\d+)[- ]foot[- ]radius",
+    re.IGNORECASE,
+)
+SCALING = re.compile(r"(?:increases|increase) by (\d+d\d+)|extra (\d+d\d+)", re.IGNORECASE)
+
+
+def extract_mechanics(description):
+    """
+    Pull structured mechanics out of a spell description.
+
+    Returns a dict with the first damage roll, every damage type rolled, the
+    saving throw ability, the area of effect and the extra dice gained from the
+    "At Higher Levels" section. Fields the text does not mention are left blank.
+    """
+    text, *higher_levels = HIGHER_LEVELS.split(description or '', maxsplit=1)
+    higher_levels = higher_levels[0] if higher_levels else ''
+
+    damage = DAMAGE.findall(text)
+    damage_types = []
+    for _, damage_type in damage:
+        damage_type = damage_type.lower()
+        if damage_type not in damage_types:
+            damage_types.append(damage_type)
+
+    save = SAVE.search(text)
+    area = AREA.search(text)
+    if area:
+        area_size = int(area.group(1) or area.group(3))
+        area_shape = (area.group(2) or 'radius').lower()
+    else:
+        area_size, area_shape = None, ''
+    scaling = SCALING.search(higher_levels)
+
+    return {
+        'damage_dice': damage[0][0] if damage else '',
+        'damage_types': damage_types,
+        'save_ability': save.group(1) if save else '',
+        'area_shape': area_shape,
+        'area_size': area_size,
+        'scaling_dice': (scaling.group(1) or scaling.group(2)) if scaling else '',
+    }
+
+
+MECHANICS_FIELDS = ['damage_dice', 'damage_types', 'save_ability', 'area_shape', 'area_size', 'scaling_dice']
+
+
+def populate_mechanics(apps, schema_editor):
+    Spell = apps.get_model('compendium', 'Spell')
+    spells = list(Spell.objects.only('pk', 'description'))
+    for spell in spells:
+        for field, value in extract_mechanics(spell.description).items():
+            setattr(spell, field, value)
+    Spell.objects.bulk_update(spells, MECHANICS_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0012_monster_cr_value_xp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spell',
+            name='area_shape',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='area_size',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='damage_dice',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='damage_types',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='save_ability',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='scaling_dice',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['damage_types'], name='spell_damage_types_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=models.Index(fields=['save_ability'], name='spell_save_ability_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spell',
+            index=models.Index(fields=['area_shape', 'area_size'], name='spell_area_idx'),
+        ),
+        migrations.RunPython(populate_mechanics, migrations.RunPython.noop),
+    ]
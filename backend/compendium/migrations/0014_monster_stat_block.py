@@ -0,0 +1,116 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def bump_compendium_version(apps, schema_editor):
+    # Cached monster payloads lack the new fields; the stat blocks themselves arrive with the next sync load
+    CompendiumVersion = apps.get_model('compendium', 'CompendiumVersion')
+    CompendiumVersion.objects.update(version=F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0013_spell_mechanics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monster',
+            name='alignment',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='charisma',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='charisma_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='constitution',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='constitution_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='dexterity',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='dexterity_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='intelligence',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='intelligence_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='legendary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='size',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='source',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='speed',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='strength',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='strength_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='wisdom',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monster',
+            name='wisdom_modifier',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['size'], name='monster_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(fields=['source'], name='monster_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(condition=models.Q(('legendary', True)), fields=['legendary'], name='monster_legendary_idx'),
+        ),
+        migrations.RunPython(bump_compendium_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compendium', '0014_monster_stat_block'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='monster',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='monster_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('type'), name='text_pattern_ops'), name='monster_type_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monster',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('source'), name='text_pattern_ops'), name='monster_source_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import get_payload, payload_cache_key, store_payload
+from .versioning import get_compendium_version
+
+
+def compendium_etag(version, renderer_format):
+    return f'"compendium-{version}-{renderer_format}"'
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value names ``etag``, weak or not, or is ``*``."""
+    client_etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+    return etag in client_etags or '*' in client_etags
+
+
+def add_compendium_cache_headers(response, etag):
+    """Set the headers every cacheable compendium response carries, however it was produced."""
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.COMPENDIUM_CACHE_MAX_AGE)
+    # The ETag differs per renderer, so shared caches must key on Accept too
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def payload_response(payload):
+    content_type, content = payload
+    return HttpResponse(content, content_type=content_type)
+
+
+class ConditionalCompendiumMixin:
+    """
+    Adds ETag and Cache-Control headers derived from the compendium version to
+    list and retrieve responses, and answers matching If-None-Match requests
+    with 304 Not Modified before any compendium query runs.
+
+    Rendered JSON bodies are also kept in the payload cache, keyed by path,
+    query parameters and version, so a cache hit serves the stored bytes
+    without touching the serializer or the database.
+    """
+    payload_cache_key = None
+
+    def get_etag(self, request):
+        return compendium_etag(get_compendium_version(), request.accepted_renderer.format)
+
+    def not_modified(self, request):
+        """Return a 304 response if the client already has the current version, else None."""
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return None
+        if etag_matches(if_none_match, self.get_etag(request)):
+            return self.add_cache_headers(request, Response(status=status.HTTP_304_NOT_MODIFIED))
+        return None
+
+    def cached_payload(self, request):
+        """Return the stored rendering of this request if there is one, else None."""
+        # Only plain JSON is cached; the browsable API embeds per-user content
+        if request.accepted_renderer.format != 'json':
+            return None
+        self.payload_cache_key = payload_cache_key(request.path, request.query_params, get_compendium_version())
+        payload = get_payload(self.payload_cache_key)
+        if payload is None:
+            return None
+        return self.add_cache_headers(request, payload_response(payload))
+
+    def add_cache_headers(self, request, response):
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            add_compendium_cache_headers(response, self.get_etag(request))
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.payload_cache_key and isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            response.render()
+            store_payload(self.payload_cache_key, response['Content-Type'], response.content)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(request) or self.cached_payload(request) or self.add_cache_headers(
+            request, super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.not_modified(request) or self.cached_payload(request) or self.add_cache_headers(
+            request, super().retrieve(request, *args, **kwargs))
@@ -1,19 +1,133 @@
+import hashlib
+import json
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.text import slugify
 
-class Monster(models.Model):
-    name = models.CharField(max_length=255)
+from .ability_scores import ABILITY_SCORES, ability_modifier, modifier_field
+from .challenge_ratings import CR_VALUES, CR_XP
+from .spell_mechanics import MECHANICS_VERSION, extract_mechanics
+
+SEARCH_CONFIG = 'english'
+
+# Weighted so that name matches outrank school matches, which outrank description matches
+SPELL_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('school', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+)
+
+
+def compute_content_hash(values):
+    payload = json.dumps(values, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ContentHashedModel(models.Model):
+    """
+    Stores a hash of ``hashed_fields`` so compendium syncs can tell which rows
+    actually changed without comparing every column.
+    """
+    hashed_fields = ()
+    # Version of the code deriving stored fields from the hashed ones, if any. It is
+    # hashed too, so a new version makes syncs rewrite rows whose content is unchanged
+    derived_version = None
+
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    class Meta:
+        abstract = True
+
+    def hashed_values(self):
+        return {field: getattr(self, field) for field in self.hashed_fields}
+
+    @classmethod
+    def hash_content(cls, values):
+        """Content hash of a mapping holding (at least) the ``hashed_fields``."""
+        hashed = {field: values[field] for field in cls.hashed_fields}
+        if cls.derived_version is not None:
+            hashed['derived_version'] = cls.derived_version
+        return compute_content_hash(hashed)
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.hash_content(self.hashed_values())
+        super().save(*args, **kwargs)
+
+
+class Monster(ContentHashedModel):
+    name = models.CharField(max_length=255, unique=True)
     url = models.URLField()
     cr = models.CharField(max_length=10)
+    cr_value = models.FloatField(blank=True, null=True, editable=False)
+    xp = models.PositiveIntegerField(blank=True, null=True, editable=False)
     type = models.CharField(max_length=100)
     ac = models.IntegerField()
     hp = models.IntegerField()
+    size = models.CharField(max_length=20, blank=True, default='')
+    speed = models.CharField(max_length=100, blank=True, default='')
+    alignment = models.CharField(max_length=100, blank=True, default='')
+    legendary = models.BooleanField(default=False)
+    source = models.CharField(max_length=100, blank=True, default='')
+
+    # Ability scores are missing for part of the bestiary, so they are nullable
+    strength = models.PositiveSmallIntegerField(blank=True, null=True)
+    dexterity = models.PositiveSmallIntegerField(blank=True, null=True)
+    constitution = models.PositiveSmallIntegerField(blank=True, null=True)
+    intelligence = models.PositiveSmallIntegerField(blank=True, null=True)
+    wisdom = models.PositiveSmallIntegerField(blank=True, null=True)
+    charisma = models.PositiveSmallIntegerField(blank=True, null=True)
+    strength_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+    dexterity_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+    constitution_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+    intelligence_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+    wisdom_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+    charisma_modifier = models.SmallIntegerField(blank=True, null=True, editable=False)
+
+    hashed_fields = (
+        'name', 'url', 'cr', 'type', 'ac', 'hp', 'size', 'speed', 'alignment', 'legendary', 'source',
+        *ABILITY_SCORES,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['type'], name='monster_type_idx'),
+            models.Index(fields=['cr'], name='monster_cr_idx'),
+            models.Index(fields=['cr_value'], name='monster_cr_value_idx'),
+            models.Index(fields=['xp'], name='monster_xp_idx'),
+            models.Index(fields=['ac'], name='monster_ac_idx'),
+            models.Index(fields=['hp'], name='monster_hp_idx'),
+            models.Index(fields=['size'], name='monster_size_idx'),
+            models.Index(fields=['source'], name='monster_source_idx'),
+            # Few monsters are legendary, so only those rows are indexed
+            models.Index(fields=['legendary'], name='monster_legendary_idx', condition=models.Q(legendary=True)),
+            # ?name= is a case-insensitive substring match and ?type=/?source= case-insensitive prefix
+            # matches, which compare UPPER(column) and so cannot use the plain indexes above
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='monster_name_trgm_idx'),
+            models.Index(OpClass(Upper('type'), name='text_pattern_ops'), name='monster_type_prefix_idx'),
+            models.Index(OpClass(Upper('source'), name='text_pattern_ops'), name='monster_source_prefix_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.cr_value = CR_VALUES.get(self.cr)
+        self.xp = CR_XP.get(self.cr)
+        for ability in ABILITY_SCORES:
+            setattr(self, modifier_field(ability), ability_modifier(getattr(self, ability)))
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
-class Spell(models.Model):
+class SpellQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        return self.update(search_vector=SPELL_SEARCH_VECTOR)
+
+
+class Spell(ContentHashedModel):
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     classes = models.JSONField()
@@ -27,11 +141,53 @@ class Spell(models.Model):
     material = models.BooleanField(default=False)
     material_cost = models.TextField(blank=True, null=True)
     description = models.TextField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Mechanics extracted from the description, see spell_mechanics.extract_mechanics
+    damage_dice = models.CharField(max_length=20, blank=True, default='', editable=False)
+    damage_types = ArrayField(models.CharField(max_length=20), blank=True, default=list, editable=False)
+    save_ability = models.CharField(max_length=20, blank=True, default='', editable=False)
+    area_shape = models.CharField(max_length=20, blank=True, default='', editable=False)
+    area_size = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    scaling_dice = models.CharField(max_length=20, blank=True, default='', editable=False)
+
+    objects = SpellQuerySet.as_manager()
+
+    hashed_fields = (
+        'name', 'slug', 'classes', 'level', 'school', 'cast_time', 'range', 'duration',
+        'verbal', 'somatic', 'material', 'material_cost', 'description',
+    )
+    derived_version = MECHANICS_VERSION
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='spell_name_idx'),
+            models.Index(fields=['level'], name='spell_level_idx'),
+            models.Index(fields=['school'], name='spell_school_idx'),
+            GinIndex(fields=['search_vector'], name='spell_search_vector_idx'),
+            GinIndex(fields=['damage_types'], name='spell_damage_types_idx'),
+            models.Index(fields=['save_ability'], name='spell_save_ability_idx'),
+            models.Index(fields=['area_shape', 'area_size'], name='spell_area_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        for field, value in extract_mechanics(self.description).items():
+            setattr(self, field, value)
         super().save(*args, **kwargs)
+        Spell.objects.filter(pk=self.pk).update_search_vector()
+
+    def __str__(self):
+        return self.name
+
+class CompendiumVersion(models.Model):
+    """
+    Single-row counter bumped whenever monster or spell data changes, used to
+    derive ETags and cache keys for compendium responses.
+    """
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"Compendium v{self.version}"
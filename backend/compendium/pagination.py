@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class CompendiumCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the view's ordering.
+
+    Pagination is opt-in: requests without ?page_size= or ?cursor= still get
+    the full, unpaginated list.
+    """
+    page_size = None
+    default_page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        if page_size is None and self.cursor_query_param in request.query_params:
+            return self.default_page_size
+        return page_size
+
+
+class SpellSearchPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
@@ -6,10 +6,24 @@ from .models import Monster, Spell
 class MonsterSerializer(serializers.ModelSerializer):
     class Meta:
         model = Monster
-        fields = ['id', 'name', 'url', 'cr', 'type', 'ac', 'hp']
+        fields = [
+            'id', 'name', 'url', 'cr', 'cr_value', 'xp', 'type', 'ac', 'hp',
+            'size', 'speed', 'alignment', 'legendary', 'source',
+            'strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma',
+            'strength_modifier', 'dexterity_modifier', 'constitution_modifier',
+            'intelligence_modifier', 'wisdom_modifier', 'charisma_modifier',
+        ]
 
 
 class SpellSerializer(serializers.ModelSerializer):
     class Meta:
         model = Spell
-        fields = "__all__"
\ No newline at end of file
+        exclude = ["search_vector", "content_hash"]
+
+class SpellSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Spell
+        fields = ['id', 'name', 'slug', 'level', 'school', 'rank', 'headline']
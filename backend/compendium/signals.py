@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Monster, Spell
+from .versioning import bump_compendium_version
+
+
+@receiver(post_save, sender=Monster)
+@receiver(post_save, sender=Spell)
+@receiver(post_delete, sender=Monster)
+@receiver(post_delete, sender=Spell)
+def compendium_changed(sender, **kwargs):
+    bump_compendium_version()
@@ -0,0 +1,194 @@
+"""
+Compendium snapshots: every Monster and Spell row in one gzip file, written
+and read with PostgreSQL COPY so neither side goes through pandas or models.
+
+A snapshot holds a magic line with the format version, a JSON header line and
+then each table's rows in COPY text format, one block after the other. The
+header records the last applied compendium migration; a snapshot can only be
+restored into a database at that same migration, since the columns (and the
+derived values stored in them) are copied as they are.
+"""
+import gzip
+import io
+import json
+import time
+
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from .models import Monster, Spell
+from .versioning import bump_compendium_version, get_compendium_version
+
+FORMAT_VERSION = 1
+MAGIC = b'DNDHELPER-COMPENDIUM'
+# Rows are matched on these keys when restoring, the same ones the CSV loaders use
+SNAPSHOT_MODELS = ((Monster, 'name'), (Spell, 'slug'))
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# Keys a snapshot header and each of its table entries must have, with their types
+HEADER_KEYS = {'schema': (str, type(None)), 'compendium_version': int, 'created': str, 'tables': list}
+TABLE_KEYS = {'model': str, 'key': str, 'columns': list, 'rows': int, 'bytes': int}
+
+
+class RestoreResult:
+    def __init__(self):
+        self.header = {}
+        self.written = {}
+        self.seconds = 0.0
+
+
+def schema_version():
+    """Name of the last compendium migration applied to the database."""
+    applied = [name for app, name in MigrationRecorder(connection).applied_migrations() if app == 'compendium']
+    return max(applied, default=None)
+
+
+def snapshot_columns(model):
+    # Ids are left to the target database, so rows already used by encounters keep theirs
+    return [field.column for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def _quoted(names):
+    return ', '.join(connection.ops.quote_name(name) for name in names)
+
+
+def _copy_out(cursor, sql):
+    if is_psycopg3:
+        with cursor.copy(sql) as copy:
+            return b''.join(bytes(data) for data in copy)
+    buffer = io.BytesIO()
+    cursor.copy_expert(sql, buffer)
+    return buffer.getvalue()
+
+
+def _copy_in(cursor, sql, data):
+    if is_psycopg3:
+        with cursor.copy(sql) as copy:
+            copy.write(data)
+    else:
+        cursor.copy_expert(sql, io.BytesIO(data))
+
+
+def dump_snapshot(path, compresslevel=6):
+    """Write the compendium to ``path`` and return the snapshot header."""
+    header = {
+        'schema': schema_version(),
+        'compendium_version': get_compendium_version(),
+        'created': timezone.now().isoformat(),
+        'tables': [],
+    }
+    blocks = []
+    # One transaction, so both tables come from the same moment
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model, key_field in SNAPSHOT_MODELS:
+            columns = snapshot_columns(model)
+            data = _copy_out(cursor, (
+                f"COPY (SELECT {_quoted(columns)} FROM {connection.ops.quote_name(model._meta.db_table)} "
+                f"ORDER BY {connection.ops.quote_name(model._meta.get_field(key_field).column)}) TO STDOUT"
+            ))
+            header['tables'].append({
+                'model': model._meta.label,
+                'key': key_field,
+                'columns': columns,
+                'rows': data.count(b'\n'),
+                'bytes': len(data),
+            })
+            blocks.append(data)
+
+    with gzip.open(path, 'wb', compresslevel=compresslevel) as snapshot:
+        snapshot.write(MAGIC + b' %d\n' % FORMAT_VERSION)
+        snapshot.write(json.dumps(header).encode() + b'\n')
+        for data in blocks:
+            snapshot.write(data)
+    return header
+
+
+def _has_keys(mapping, keys):
+    return isinstance(mapping, dict) and all(isinstance(mapping.get(key), types) for key, types in keys.items())
+
+
+def check_header(header):
+    """Raise SnapshotError unless ``header`` has the structure ``dump_snapshot`` writes."""
+    if not _has_keys(header, HEADER_KEYS) or not all(_has_keys(table, TABLE_KEYS) for table in header['tables']):
+        raise SnapshotError("The snapshot header is malformed")
+
+
+def read_snapshot(path):
+    """Return the header of the snapshot at ``path`` and the COPY data of each of its tables."""
+    try:
+        with gzip.open(path, 'rb') as snapshot:
+            magic, _, version = snapshot.readline().rstrip(b'\n').partition(b' ')
+            if magic != MAGIC:
+                raise SnapshotError(f"{path} is not a compendium snapshot")
+            if version != str(FORMAT_VERSION).encode():
+                raise SnapshotError(
+                    f"Snapshot format {version.decode()} is not supported (expected {FORMAT_VERSION})"
+                )
+            header = json.loads(snapshot.readline())
+            check_header(header)
+            blocks = [snapshot.read(table['bytes']) for table in header['tables']]
+    except (OSError, EOFError, ValueError) as e:
+        raise SnapshotError(f"Could not read {path}: {e}") from e
+
+    if any(len(data) != table['bytes'] for data, table in zip(blocks, header['tables'])):
+        raise SnapshotError(f"{path} is truncated")
+    return header, blocks
+
+
+def restore_snapshot(path):
+    """
+    Load the snapshot at ``path`` into the compendium in a single transaction.
+
+    Each table's rows are COPYed into a temporary table and upserted on the
+    table's key from there, so existing rows keep their ids and rows whose
+    content hash is unchanged are not rewritten. Rows missing from the
+    snapshot are left alone.
+    """
+    started = time.perf_counter()
+    result = RestoreResult()
+    header, blocks = read_snapshot(path)
+    result.header = header
+
+    current = schema_version()
+    if header['schema'] != current:
+        raise SnapshotError(
+            f"The snapshot was taken at compendium migration {header['schema']}, but the database is at "
+            f"{current}. Take a new snapshot or load the CSV files instead."
+        )
+    models = {model._meta.label: (model, key_field) for model, key_field in SNAPSHOT_MODELS}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, data in zip(header['tables'], blocks):
+            model, key_field = models.get(table['model'], (None, None))
+            columns = table['columns']
+            if model is None or columns != snapshot_columns(model):
+                raise SnapshotError(f"The columns of {table['model']} do not match the snapshot")
+
+            target = connection.ops.quote_name(model._meta.db_table)
+            stage = connection.ops.quote_name(f"{model._meta.db_table}_restore")
+            key = connection.ops.quote_name(model._meta.get_field(key_field).column)
+            updates = ', '.join(f"{name} = EXCLUDED.{name}" for name in map(connection.ops.quote_name, columns))
+
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {_quoted(columns)} FROM {target} WITH NO DATA"
+            )
+            _copy_in(cursor, f"COPY {stage} ({_quoted(columns)}) FROM STDIN", data)
+            cursor.execute(
+                f"INSERT INTO {target} ({_quoted(columns)}) SELECT {_quoted(columns)} FROM {stage} "
+                f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+                f"WHERE {target}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+            )
+            result.written[table['model']] = cursor.rowcount
+
+        if any(result.written.values()):
+            bump_compendium_version()
+
+    result.seconds = time.perf_counter() - started
+    return result
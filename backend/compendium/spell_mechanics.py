@@ -0,0 +1,62 @@
+import re
+
+# Part of every spell's content hash: bump it whenever the extraction below changes
+# so that ``load_spell_data --sync`` rewrites the stored mechanics of every spell
+MECHANICS_VERSION = 1
+
+DAMAGE_TYPES = (
+    'acid', 'bludgeoning', 'cold', 'fire', 'force', 'lightning', 'necrotic',
+    'piercing', 'poison', 'psychic', 'radiant', 'slashing', 'thunder',
+)
+ABILITIES = ('Strength', 'Dexterity', 'Constitution', 'Intelligence', 'Wisdom', 'Charisma')
+AREA_SHAPES = ('cone', 'cube', 'cylinder', 'line', 'sphere', 'square', 'radius')
+
+HIGHER_LEVELS = re.compile(r'\n\s*At Higher Levels\.?', re.IGNORECASE)
+DAMAGE = re.compile(
+    rf"(\d+d\d+)(?:\s*\+\s*[\w ]+?)?\s+({'|'.join(DAMAGE_TYPES)})\s+damage", re.IGNORECASE
+)
+SAVE = re.compile(rf"({'|'.join(ABILITIES)}) saving throw")
+# "60-foot cone", "20-foot-radius sphere", "10-foot radius, 40-foot-high cylinder", "10-foot radius"
+AREA = re.compile(
+    r"(\d+)[- ]foot(?:[- ]radius)?(?:,? \d+[- ]foot[- ]high)?[- ](cone|cube|cylinder|line|sphere|square)"
+    r"|(\d+)[- ]foot[- ]radius",
+    re.IGNORECASE,
+)
+SCALING = re.compile(r"(?:increases|increase) by (\d+d\d+)|extra (\d+d\d+)", re.IGNORECASE)
+
+
+def extract_mechanics(description):
+    """
+    Pull structured mechanics out of a spell description.
+
+    Returns a dict with the first damage roll, every damage type rolled, the
+    saving throw ability, the area of effect and the extra dice gained from the
+    "At Higher Levels" section. Fields the text does not mention are left blank.
+    """
+    text, *higher_levels = HIGHER_LEVELS.split(description or '', maxsplit=1)
+    higher_levels = higher_levels[0] if higher_levels else ''
+
+    damage = DAMAGE.findall(text)
+    damage_types = []
+    for _, damage_type in damage:
+        damage_type = damage_type.lower()
+        if damage_type not in damage_types:
+            damage_types.append(damage_type)
+
+    save = SAVE.search(text)
+    area = AREA.search(text)
+    if area:
+        area_size = int(area.group(1) or area.group(3))
+        area_shape = (area.group(2) or 'radius').lower()
+    else:
+        area_size, area_shape = None, ''
+    scaling = SCALING.search(higher_levels)
+
+    return {
+        'damage_dice': damage[0][0] if damage else '',
+        'damage_types': damage_types,
+        'save_ability': save.group(1) if save else '',
+        'area_shape': area_shape,
+        'area_size': area_size,
+        'scaling_dice': (scaling.group(1) or scaling.group(2)) if scaling else '',
+    }
@@ -0,0 +1,409 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from encounters.models import Encounter, MonsterEncounterData
+
+from .loaders import SpellLoader
+from .models import CompendiumVersion, Monster, Spell
+from .views import MonsterViewSet, SpellViewSet
+from .snapshot import FORMAT_VERSION, MAGIC, SnapshotError, dump_snapshot, read_snapshot, restore_snapshot
+
+
+class CompendiumCacheHeaderTests(APITestCase):
+    url = '/api/monsters/'
+
+    def setUp(self):
+        cache.clear()
+        Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+
+    def cache_headers(self, response):
+        return {header: response.get(header) for header in ('ETag', 'Vary', 'Cache-Control')}
+
+    def test_cache_hits_send_the_same_headers_as_misses(self):
+        miss = self.client.get(self.url)
+        hit = self.client.get(self.url)
+        self.assertEqual(miss.status_code, 200)
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(self.cache_headers(hit), self.cache_headers(miss))
+        self.assertIn('Accept', hit['Vary'])
+
+    def test_not_modified_sends_the_same_headers(self):
+        miss = self.client.get(self.url)
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=miss['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.cache_headers(not_modified), self.cache_headers(miss))
+
+    def test_etag_names_the_negotiated_renderer(self):
+        json_etag = self.client.get(self.url)['ETag']
+        browsable = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertNotEqual(browsable['ETag'], json_etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=json_etag, HTTP_ACCEPT='text/html').status_code, 200)
+
+
+class AsyncReadParityTests(APITestCase):
+    """The async views answer cache hits themselves; those must match what the viewsets render."""
+
+    def setUp(self):
+        cache.clear()
+        Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+        Spell.objects.create(
+            name='Fireball', classes=['Wizard'], level=3, school='Evocation', cast_time='1 action',
+            range='150 feet', duration='Instantaneous', description='A bright streak of fire.',
+        )
+        self.monster = Monster.objects.get()
+        self.spell = Spell.objects.get()
+
+    def assert_parity(self, path, view, **kwargs):
+        # The viewset fills the payload cache, which the async view then answers from without a query
+        expected = view(APIRequestFactory().get(path), **kwargs).render()
+        with self.assertNumQueries(0):
+            hit = self.client.get(path)
+        self.assertEqual(hit.status_code, expected.status_code)
+        self.assertEqual(json.loads(hit.content), json.loads(expected.content))
+        self.assertEqual(hit['ETag'], expected['ETag'])
+        self.assertEqual(hit['Content-Type'], expected['Content-Type'])
+
+    def test_monster_reads(self):
+        self.assert_parity('/api/monsters/', MonsterViewSet.as_view({'get': 'list'}))
+        detail = MonsterViewSet.as_view({'get': 'retrieve'})
+        self.assert_parity(f'/api/monsters/{self.monster.pk}/', detail, pk=self.monster.pk)
+
+    def test_spell_reads(self):
+        self.assert_parity('/api/spells/?level=3', SpellViewSet.as_view({'get': 'list'}))
+        detail = SpellViewSet.as_view({'get': 'retrieve'})
+        self.assert_parity(f'/api/spells/{self.spell.slug}/', detail, slug=self.spell.slug)
+        search = SpellViewSet.as_view({'get': 'search'}, **SpellViewSet.search.kwargs)
+        self.assert_parity('/api/spells/search/?q=fire', search)
+
+
+class SpellSyncTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'spells.csv'
+        with open(self.path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(SpellLoader.required_columns)
+            writer.writerow([
+                'Fireball', 'Sorcerer, Wizard', 3, 'Evocation', '1 action', '150 feet', 'Instantaneous',
+                1, 1, 1, '', 'Each creature in a 20-foot-radius sphere takes 8d6 fire damage.',
+            ])
+
+    def sync(self):
+        return SpellLoader(self.path, sync=True, rejects_path=self.path.with_suffix('.rejected')).run()
+
+    def test_unchanged_spells_are_skipped(self):
+        self.assertEqual(len(self.sync().inserted), 1)
+        self.assertEqual(self.sync().unchanged, 1)
+
+    def test_a_new_mechanics_version_re_extracts_every_spell(self):
+        self.sync()
+        Spell.objects.update(damage_dice='')
+        with mock.patch.object(Spell, 'derived_version', Spell.derived_version + 1):
+            result = self.sync()
+        self.assertEqual(result.updated, ['fireball'])
+        self.assertEqual(Spell.objects.get().damage_dice, '8d6')
+
+    def load(self):
+        output = io.StringIO()
+        call_command('load_spell_data', file_path=str(self.path), stdout=output)
+        return output.getvalue()
+
+    def test_process_local_caches_are_not_warmed(self):
+        self.assertIn("Skipped warming the compendium payload cache", self.load())
+
+    def test_shared_caches_are_warmed(self):
+        caches = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(self.path.parent / 'cache'),
+        }}
+        with override_settings(CACHES=caches):
+            self.assertIn("Warmed compendium payload cache", self.load())
+
+    def test_loader_and_model_hash_alike(self):
+        self.sync()
+        spell = Spell.objects.get()
+        stored = spell.content_hash
+        spell.save()
+        self.assertEqual(spell.content_hash, stored)
+
+
+class MonsterNameMigrationTests(TransactionTestCase):
+    before = [('compendium', '0008_spell_search_vector')]
+    after = [('compendium', '0009_monster_name_unique')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        call_command('migrate', verbosity=0)
+
+    def test_duplicate_names_are_merged_into_the_oldest_row(self):
+        OldMonster = self.migrate(self.before).get_model('compendium', 'Monster')
+        fields = {'url': '', 'cr': '1/4', 'type': 'humanoid', 'ac': 15, 'hp': 7}
+        kept = OldMonster.objects.create(name='Goblin', **fields)
+        duplicate = OldMonster.objects.create(name='Goblin', **fields)
+        # The encounter tables are unaffected, so the current models can write them
+        encounter = Encounter.objects.create(user=User.objects.create_user('dm'), name='Ambush')
+        participant = MonsterEncounterData.objects.create(encounter=encounter, monster_id=duplicate.id, current_hp=7)
+
+        NewMonster = self.migrate(self.after).get_model('compendium', 'Monster')
+        self.assertEqual(list(NewMonster.objects.values_list('id', flat=True)), [kept.id])
+        participant.refresh_from_db()
+        self.assertEqual(participant.monster_id, kept.id)
+
+
+class SnapshotHeaderTests(TestCase):
+    def write_snapshot(self, header):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'compendium.snapshot.gz'
+        with gzip.open(path, 'wb') as snapshot:
+            snapshot.write(MAGIC + b' %d\n' % FORMAT_VERSION)
+            snapshot.write(json.dumps(header).encode() + b'\n')
+        return path
+
+    def test_malformed_headers_are_rejected(self):
+        table = {'model': 'compendium.Monster', 'key': 'name', 'columns': ['name'], 'rows': 0, 'bytes': 0}
+        valid = {'schema': '0014_monster_stat_block', 'compendium_version': 1, 'created': '', 'tables': [table]}
+        self.assertEqual(read_snapshot(self.write_snapshot(valid))[0], valid)
+
+        for header in (
+            [],
+            {key: value for key, value in valid.items() if key != 'tables'},
+            dict(valid, tables=[{key: value for key, value in table.items() if key != 'bytes'}]),
+            dict(valid, tables=['compendium.Monster']),
+            dict(valid, compendium_version='1'),
+        ):
+            with self.subTest(header=header), self.assertRaisesMessage(SnapshotError, 'malformed'):
+                read_snapshot(self.write_snapshot(header))
+
+
+class SnapshotRoundTripTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'compendium.snapshot.gz'
+        self.goblin = Monster.objects.create(name='Goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7, strength=8)
+        Monster.objects.create(name='Ogre', url='', cr='2', type='giant', ac=11, hp=59)
+        Spell.objects.create(
+            name='Fireball', classes=['Wizard'], level=3, school='Evocation', cast_time='1 action',
+            range='150 feet', duration='Instantaneous', description='A Dexterity saving throw against fire.',
+        )
+
+    def version(self):
+        return CompendiumVersion.objects.get_or_create(pk=1)[0].version
+
+    def rows(self):
+        return (
+            list(Monster.objects.order_by('name').values()),
+            list(Spell.objects.order_by('slug').values()),
+        )
+
+    def test_restore_brings_back_the_dumped_rows(self):
+        expected = self.rows()
+        header = dump_snapshot(self.path)
+        self.assertEqual([table['rows'] for table in header['tables']], [2, 1])
+
+        # A changed row and a deleted one; the goblin keeps its id, so encounters using it stay valid
+        Monster.objects.filter(pk=self.goblin.pk).update(hp=1, strength=20, content_hash='edited')
+        Spell.objects.all().delete()
+        version = self.version()
+
+        result = restore_snapshot(self.path)
+        self.assertEqual(result.written, {'compendium.Monster': 1, 'compendium.Spell': 1})
+        self.assertEqual(self.version(), version + 1)
+        monsters, spells = self.rows()
+        self.assertEqual(monsters, expected[0])
+        self.assertEqual([{**spell, 'id': None} for spell in spells], [{**spell, 'id': None} for spell in expected[1]])
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        dump_snapshot(self.path)
+        version = self.version()
+        result = restore_snapshot(self.path)
+        self.assertEqual(result.written, {'compendium.Monster': 0, 'compendium.Spell': 0})
+        self.assertEqual(self.version(), version)
+
+    def test_snapshots_from_another_migration_are_refused(self):
+        dump_snapshot(self.path)
+        header, blocks = read_snapshot(self.path)
+        with gzip.open(self.path, 'wb') as snapshot:
+            snapshot.write(MAGIC + b' %d\n' % FORMAT_VERSION)
+            snapshot.write(json.dumps(dict(header, schema='0001_initial')).encode() + b'\n')
+            snapshot.writelines(blocks)
+        Monster.objects.filter(pk=self.goblin.pk).update(hp=1, content_hash='edited')
+
+        with self.assertRaisesMessage(SnapshotError, '0001_initial'):
+            restore_snapshot(self.path)
+        self.assertEqual(Monster.objects.get(pk=self.goblin.pk).hp, 1)
+
+
+class MonsterFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        fields = {'url': '', 'type': 'dragon', 'ac': 19, 'hp': 200}
+        Monster.objects.create(name='Adult Red Dragon', cr='17', legendary=True, **fields)
+        Monster.objects.create(name='Young Red Dragon', cr='10', **fields)
+
+    def names(self, query):
+        response = self.client.get(f'/api/monsters/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [monster['name'] for monster in response.json()]
+
+    def test_legendary(self):
+        self.assertEqual(self.names('legendary=true'), ['Adult Red Dragon'])
+        self.assertEqual(self.names('legendary=0'), ['Young Red Dragon'])
+        self.assertEqual(len(self.names('legendary=')), 2)
+
+    def test_invalid_legendary_is_rejected(self):
+        response = self.client.get('/api/monsters/?legendary=yes')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('legendary', response.json())
+
+    def add_humanoids(self):
+        fields = {'url': '', 'ac': 15, 'hp': 7}
+        Monster.objects.create(name='Goblin', cr='1/4', type='humanoid (goblinoid)', **fields)
+        Monster.objects.create(name='Red Wizard', cr='6', type='Humanoid (any race)', **fields)
+
+    def test_name_matches_any_part_ignoring_case(self):
+        self.add_humanoids()
+        self.assertEqual(self.names('name=RED'), ['Adult Red Dragon', 'Red Wizard', 'Young Red Dragon'])
+        self.assertEqual(self.names('name=gob'), ['Goblin'])
+
+    def test_type_matches_the_leading_word_ignoring_case(self):
+        self.add_humanoids()
+        self.assertEqual(self.names('type=HUMANOID'), ['Goblin', 'Red Wizard'])
+        self.assertEqual(self.names('type=goblinoid'), [])
+        self.assertEqual(len(self.names('type=dragon,humanoid')), 4)
+
+    def test_ordering(self):
+        self.add_humanoids()
+        # Challenge ratings order by value, so "1/4" comes before "6" and "10"
+        self.assertEqual(self.names('ordering=cr'), ['Goblin', 'Red Wizard', 'Young Red Dragon', 'Adult Red Dragon'])
+        self.assertEqual(self.names('ordering=-hp,name'), ['Adult Red Dragon', 'Young Red Dragon', 'Goblin', 'Red Wizard'])
+        self.assertEqual(self.names('ordering=unknown'), self.names(''))
+
+    def test_cursor_pages(self):
+        self.add_humanoids()
+        response = self.client.get('/api/monsters/?page_size=3&ordering=cr')
+        first = response.json()
+        self.assertEqual([monster['name'] for monster in first['results']], ['Goblin', 'Red Wizard', 'Young Red Dragon'])
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual([monster['name'] for monster in second['results']], ['Adult Red Dragon'])
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get(second['previous']).json()['results'], first['results'])
+
+    def test_filters_use_the_pattern_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            for query, index in (
+                (Monster.objects.filter(name__icontains='red'), 'monster_name_trgm_idx'),
+                (Monster.objects.filter(type__istartswith='humanoid'), 'monster_type_prefix_idx'),
+                (Monster.objects.filter(source__istartswith='monster manual'), 'monster_source_prefix_idx'),
+            ):
+                with self.subTest(index=index):
+                    self.assertIn(index, query.explain())
+
+
+class SpellFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        fields = {'classes': ['Wizard'], 'cast_time': '1 action', 'range': '60 feet', 'duration': 'Instantaneous'}
+        Spell.objects.create(
+            name='Fireball', level=3, school='Evocation',
+            description='Each creature in a 20-foot-radius sphere must make a Dexterity saving throw.', **fields,
+        )
+        Spell.objects.create(
+            name='Hold Person', level=2, school='Enchantment',
+            description='Choose a humanoid that you can see. It must succeed on a Wisdom saving throw.', **fields,
+        )
+
+    def names(self, query):
+        response = self.client.get(f'/api/spells/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [spell['name'] for spell in response.json()]
+
+    def test_save_accepts_names_and_abbreviations(self):
+        self.assertEqual(self.names('save=dex'), ['Fireball'])
+        self.assertEqual(self.names('save=Wisdom'), ['Hold Person'])
+        self.assertEqual(self.names('save=dex,wis'), ['Fireball', 'Hold Person'])
+        self.assertEqual(self.names('save=str'), [])
+
+    def test_unknown_save_is_rejected(self):
+        for query in ('save=foo', 'save=dex,foo'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/spells/?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('save', response.json())
+
+
+class SpellSearchTests(APITestCase):
+    url = '/api/spells/search/'
+
+    def setUp(self):
+        cache.clear()
+        fields = {'classes': ['Wizard'], 'cast_time': '1 action', 'range': '120 feet', 'duration': 'Instantaneous'}
+        self.fire_bolt = Spell.objects.create(
+            name='Fire Bolt', level=0, school='Evocation',
+            description='You hurl a mote of flame at a creature or object within range.', **fields,
+        )
+        Spell.objects.create(
+            name='Burning Hands', level=1, school='Evocation',
+            description='A thin sheet of flames shoots forth. The fire ignites any flammable objects.', **fields,
+        )
+        Spell.objects.create(
+            name='Shield', level=1, school='Abjuration',
+            description='An invisible barrier of magical force appears and protects you.', **fields,
+        )
+
+    def search(self, query):
+        response = self.client.get(f'{self.url}?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_saving_maintains_the_search_vector(self):
+        self.assertIn("'mote'", Spell.objects.values_list('search_vector', flat=True).get(pk=self.fire_bolt.pk))
+        self.fire_bolt.description = 'A crackling spark leaps from your finger.'
+        self.fire_bolt.save()
+        vector = Spell.objects.values_list('search_vector', flat=True).get(pk=self.fire_bolt.pk)
+        self.assertIn("'spark'", vector)
+        self.assertNotIn("'mote'", vector)
+
+    def test_name_matches_rank_above_description_matches(self):
+        results = self.search('q=fire')
+        self.assertEqual([spell['name'] for spell in results], ['Fire Bolt', 'Burning Hands'])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+    def test_headline_marks_the_matched_words(self):
+        burning_hands = self.search('q=ignites')[0]
+        self.assertEqual(burning_hands['name'], 'Burning Hands')
+        self.assertIn('<mark>ignites</mark>', burning_hands['headline'])
+
+    def test_web_search_syntax_and_filters(self):
+        self.assertEqual([spell['name'] for spell in self.search('q=fire -bolt')], ['Burning Hands'])
+        self.assertEqual([spell['name'] for spell in self.search('q=fire&level=0')], ['Fire Bolt'])
+        self.assertEqual(self.search('q=fire&limit=1')[0]['name'], 'Fire Bolt')
+
+    def test_query_is_required(self):
+        response = self.client.get(f'{self.url}?q=%20')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', response.json())
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import MonsterViewSet, SpellViewSet
@@ -9,4 +10,16 @@ router.register(r'spells', SpellViewSet, basename='spell')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from . import async_views
+
+    # Listed before the router's routes so they match first; those keep their names for reverse()
+    urlpatterns = [
+        path('monsters/', async_views.monster_list),
+        path('monsters/<int:pk>/', async_views.monster_detail),
+        path('spells/', async_views.spell_list),
+        path('spells/search/', async_views.spell_search),
+        path('spells/<slug:slug>/', async_views.spell_detail),
+    ] + urlpatterns
@@ -0,0 +1,40 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import CompendiumVersion
+
+VERSION_CACHE_KEY = 'compendium:version'
+VERSION_ROW_ID = 1
+
+
+def get_compendium_version():
+    """
+    Return the current compendium version.
+
+    The value is cached for ``COMPENDIUM_VERSION_TTL`` seconds, so with a
+    per-process cache backend other workers pick up a bump within that window.
+    """
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = CompendiumVersion.objects.get_or_create(pk=VERSION_ROW_ID)[0].version
+        cache.set(VERSION_CACHE_KEY, version, settings.COMPENDIUM_VERSION_TTL)
+    return version
+
+
+async def aget_compendium_version():
+    """``get_compendium_version`` for async views; the database is only read on a cache miss."""
+    version = await cache.aget(VERSION_CACHE_KEY)
+    if version is None:
+        version = await sync_to_async(get_compendium_version)()
+    return version
+
+
+def bump_compendium_version():
+    """Increment the compendium version; the cached value is refreshed once the transaction commits."""
+    updated = CompendiumVersion.objects.filter(pk=VERSION_ROW_ID).update(version=F('version') + 1)
+    if not updated:
+        CompendiumVersion.objects.get_or_create(pk=VERSION_ROW_ID, defaults={'version': 2})
+    transaction.on_commit(lambda: cache.delete(VERSION_CACHE_KEY))
@@ -1,15 +1,62 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 
-from .models import Monster, Spell
-from .serializers import MonsterSerializer, SpellSerializer
+from config.mixins import ValuesListMixin
 
+from .filters import CompendiumOrderingFilter, MonsterFilter, SpellFilter
+from .mixins import ConditionalCompendiumMixin
+from .models import SEARCH_CONFIG, Monster, Spell
+from .pagination import CompendiumCursorPagination, SpellSearchPagination
+from .serializers import MonsterSerializer, SpellSearchResultSerializer, SpellSerializer
 
-class MonsterViewSet(viewsets.ReadOnlyModelViewSet):
+
+class MonsterViewSet(ConditionalCompendiumMixin, ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Monster.objects.all()
     serializer_class = MonsterSerializer
+    pagination_class = CompendiumCursorPagination
+    filter_backends = [MonsterFilter, CompendiumOrderingFilter]
+    ordering_fields = ['name', 'type', 'cr', 'xp', 'ac', 'hp']
+    ordering_aliases = {'cr': 'cr_value'}
+    ordering = ['name', 'id']
 
 
-class SpellViewSet(viewsets.ReadOnlyModelViewSet):
+class SpellViewSet(ConditionalCompendiumMixin, ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Spell.objects.all()
     serializer_class = SpellSerializer
-    lookup_field = 'slug'
\ No newline at end of file
+    lookup_field = 'slug'
+    pagination_class = CompendiumCursorPagination
+    filter_backends = [SpellFilter, CompendiumOrderingFilter]
+    ordering_fields = ['name', 'level', 'school']
+    ordering = ['name', 'id']
+
+    @action(detail=False, methods=['get'], pagination_class=SpellSearchPagination)
+    def search(self, request):
+        """Ranked full-text search over spell name, school and description."""
+        cached = self.not_modified(request) or self.cached_payload(request)
+        if cached:
+            return cached
+
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': ["This query parameter is required."]})
+
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        spells = (
+            SpellFilter().filter_queryset(request, Spell.objects.all(), self)
+            .filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F('search_vector'), query),
+                headline=SearchHeadline(
+                    'description', query, config=SEARCH_CONFIG,
+                    start_sel='<mark>', stop_sel='</mark>', max_fragments=2,
+                ),
+            )
+            .order_by('-rank', 'name', 'id')
+        )
+
+        page = self.paginate_queryset(spells)
+        serializer = SpellSearchResultSerializer(page, many=True)
+        return self.add_cache_headers(request, self.get_paginated_response(serializer.data))
@@ -0,0 +1,47 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.request import Request
+
+
+def negotiated_format(request, view_class):
+    """
+    The format of the renderer DRF would pick for ``request`` on ``view_class``,
+    or None if nothing is acceptable. Negotiation only looks at the Accept
+    header and the format parameter, so it is safe to run on the event loop.
+    """
+    negotiator = view_class.content_negotiation_class()
+    renderers = [renderer() for renderer in view_class.renderer_classes]
+    try:
+        renderer, _ = negotiator.select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        return None
+    return renderer.format
+
+
+def with_async_reads(view, read):
+    """
+    Wrap the synchronous ``view`` in an async view that first offers GET
+    requests to the coroutine ``read(request, renderer_format, *args, **kwargs)``,
+    where ``renderer_format`` is what content negotiation settled on.
+
+    ``read`` answers the cheap, common cases without leaving the event loop
+    and returns None for anything else, which is then handed to ``view`` in
+    the sync thread together with every other method. Errors, the browsable
+    API and writes therefore behave exactly as before.
+    """
+    sync_view = sync_to_async(view)
+
+    # Copies csrf_exempt and the other attributes DRF sets on its views
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method == 'GET':
+            renderer_format = negotiated_format(request, view.cls)
+            if renderer_format is not None:
+                response = await read(request, renderer_format, *args, **kwargs)
+                if response is not None:
+                    return response
+        return await sync_view(request, *args, **kwargs)
+
+    return async_view
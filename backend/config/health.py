@@ -0,0 +1,37 @@
+from django.db import DatabaseError, connections
+from django.http import JsonResponse
+
+POOL_STATS = ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')
+
+
+def check_database(alias):
+    """
+    Validate the idle connections of the alias' pool, if it has one, then run
+    a trivial query over a connection borrowed the way a request would.
+    """
+    connection = connections[alias]
+    pool = connection.pool if connection.vendor == 'postgresql' else None
+    result = {'status': 'ok'}
+    try:
+        if pool is not None:
+            pool.open()
+            # Tests every idle connection and replaces the broken ones
+            pool.check()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError as error:
+        result = {'status': 'error', 'error': str(error)}
+    if pool is not None:
+        stats = pool.get_stats()
+        result['pool'] = {name: stats.get(name, 0) for name in POOL_STATS}
+    return result
+
+
+def health_view(request):
+    """Liveness and database readiness; answers 503 when a database cannot be reached."""
+    databases = {alias: check_database(alias) for alias in connections}
+    healthy = all(database['status'] == 'ok' for database in databases.values())
+    return JsonResponse(
+        {'status': 'ok' if healthy else 'error', 'databases': databases},
+        status=200 if healthy else 503,
+    )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.renderers import JSONRenderer
+
+from config.mixins import ValuesListMixin
+from config.renderers import ORJSONRenderer
+
+
+def _viewsets(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _viewsets(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            cls = getattr(pattern.callback, 'cls', None)
+            if cls is not None and issubclass(cls, ValuesListMixin):
+                yield cls
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every stored row through both the serializer and the ValuesListMixin "
+        "fast path and fail if the JSON differs"
+    )
+
+    def handle(self, *args, **options):
+        failures = 0
+        for cls in dict.fromkeys(_viewsets(get_resolver().url_patterns)):
+            view = cls(request=None, format_kwarg=None, kwargs={}, action='list')
+            queryset = cls.queryset.model._default_manager.order_by('pk')
+            plan = view.get_values_plan()
+
+            expected = view.get_serializer(queryset, many=True).data
+            actual = view.values_to_representation(view.values_queryset(queryset, plan), plan)
+            if JSONRenderer().render(expected) == ORJSONRenderer().render(actual):
+                self.stdout.write(self.style.SUCCESS(f"{cls.__name__}: {len(actual)} rows identical"))
+                continue
+
+            failures += 1
+            mismatch = next(
+                (pair for pair in zip(expected, actual)
+                 if JSONRenderer().render(pair[0]) != ORJSONRenderer().render(pair[1])),
+                None,
+            )
+            self.stderr.write(self.style.ERROR(f"{cls.__name__}: fast path output differs"))
+            if mismatch:
+                self.stderr.write(f"  serializer: {JSONRenderer().render(mismatch[0]).decode()}")
+                self.stderr.write(f"  fast path:  {ORJSONRenderer().render(mismatch[1]).decode()}")
+
+        if failures:
+            raise CommandError(f"{failures} viewset(s) differ")
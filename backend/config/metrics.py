@@ -0,0 +1,134 @@
+import os
+import time
+from hmac import compare_digest
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+LABELS = ['view', 'method']
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+# Requests that did not resolve to a view share one label, so random 404 paths cannot blow up cardinality
+UNRESOLVED = 'unresolved'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling the request', LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries run while handling the request', LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_QUERY_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL queries while handling the request', LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of the response body', LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+class QueryCounter:
+    """Database execute wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and time, and response size per resolved
+    view name and HTTP method. Disabled entirely with METRICS_ENABLED=False.
+    Works under both WSGI and ASGI, so async views stay on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        # The connection handler is context-local, so queries run by sync_to_async code are counted too
+        with connection.execute_wrapper(queries):
+            response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, queries)
+        return response
+
+    @staticmethod
+    def observe(request, response, elapsed, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else UNRESOLVED
+        method = request.method if request.method in METHODS else 'other'
+
+        REQUEST_LATENCY.labels(view, method).observe(elapsed)
+        REQUEST_QUERIES.labels(view, method).observe(queries.count)
+        REQUEST_QUERY_TIME.labels(view, method).observe(queries.seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+
+
+def _can_read_metrics(request):
+    header = request.headers.get('Authorization', '')
+    scheme, _, credentials = header.partition(' ')
+    if scheme.lower() != 'bearer' or not credentials:
+        return False
+    if settings.METRICS_TOKEN and compare_digest(credentials.encode(), settings.METRICS_TOKEN.encode()):
+        return True
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the request metrics.
+
+    Scrapers authenticate with ``Authorization: Bearer <METRICS_TOKEN>``; staff
+    users can use their access token instead. When PROMETHEUS_MULTIPROC_DIR is
+    set the samples of every worker process are merged.
+    """
+    if not _can_read_metrics(request):
+        response = HttpResponse('Authentication required.', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,71 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .renderers import ORJSONRenderer
+
+# Field types whose representation of a .values() result is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.IntegerField,
+    serializers.JSONField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesListMixin:
+    """
+    Opt-in fast path for ``list``.
+
+    Rows are read with ``.values()`` and mapped straight to the serializer's
+    output, skipping model instances and per-field serializer dispatch, then
+    encoded with orjson. Only serializers made of flat, model-backed fields
+    are supported; their output is identical to the regular path (see the
+    ``check_fast_read`` command).
+    """
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def get_values_plan(self):
+        """Return ``(name, source, convert)`` for each field the serializer outputs."""
+        serializer = self.get_serializer()
+        model = serializer.Meta.model
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                if isinstance(field, serializers.BaseSerializer) or '.' in field.source:
+                    raise FieldDoesNotExist
+                model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{type(self).__name__} cannot use ValuesListMixin: "
+                    f"field '{name}' is not a plain model field."
+                )
+            convert = None if isinstance(field, PASSTHROUGH_FIELDS) else field.to_representation
+            plan.append((name, field.source, convert))
+        return plan
+
+    def values_queryset(self, queryset, plan):
+        # Keyset pagination reads the ordering columns from each row, so fetch them too
+        ordering = [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)]
+        columns = dict.fromkeys([source for _, source, _ in plan] + ordering)
+        return queryset.values(*columns)
+
+    @staticmethod
+    def values_to_representation(rows, plan):
+        return [
+            {
+                name: row[source] if convert is None or row[source] is None else convert(row[source])
+                for name, source, convert in plan
+            }
+            for row in rows
+        ]
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan()
+        rows = self.values_queryset(self.filter_queryset(self.get_queryset()), plan)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.values_to_representation(page, plan))
+        return Response(self.values_to_representation(rows, plan))
@@ -20,13 +20,19 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 ALLOWED_HOSTS = ['*']
 
 INSTALLED_APPS = [
+    'daphne',
     'player_characters',
     'encounters',
     'sign_in',
     'compendium',
+    'dice',
+    # Project-wide code, such as the check_fast_read command
+    'config',
     'rest_framework_simplejwt',
     'corsheaders',
     'rest_framework',
+    'channels',
+    "django.contrib.postgres",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -37,11 +43,12 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'sign_in.authentication.CachedJWTAuthentication',
     ),
 }
 
 MIDDLEWARE = [
+    'config.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -57,10 +64,62 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Tokens carry a digest of the password hash, so changing the password revokes them
+    "CHECK_REVOKE_TOKEN": True,
 }
 
+# 🔹 Authenticated users are cached per process for AUTH_USER_CACHE_TTL seconds (0 turns
+# the cache off). AUTH_STATELESS_READS lets read-only requests trust the token claims
+# without loading the user at all
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=4096, cast=int)
+AUTH_STATELESS_READS = config('AUTH_STATELESS_READS', default=False, cast=bool)
+
 CORS_ALLOW_ALL_ORIGINS = True
 
+# 🔹 Compendium HTTP caching: how long clients may reuse a response, and how long
+# each process trusts its cached compendium version before re-reading it
+COMPENDIUM_CACHE_MAX_AGE = config('COMPENDIUM_CACHE_MAX_AGE', default=60, cast=int)
+COMPENDIUM_VERSION_TTL = config('COMPENDIUM_VERSION_TTL', default=5, cast=int)
+# 🔹 Rendered compendium responses are stored in this cache alias
+COMPENDIUM_PAYLOAD_CACHE = config('COMPENDIUM_PAYLOAD_CACHE', default='default')
+COMPENDIUM_PAYLOAD_CACHE_TIMEOUT = config('COMPENDIUM_PAYLOAD_CACHE_TIMEOUT', default=3600, cast=int)
+
+# 🔹 Combat simulations above this many trials are split across a process pool
+SIMULATION_PARALLEL_THRESHOLD = config('SIMULATION_PARALLEL_THRESHOLD', default=20000, cast=int)
+SIMULATION_WORKERS = config('SIMULATION_WORKERS', default=2, cast=int)
+
+# 🔹 Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a file or
+# shared cache so every worker (and the loader commands) see the same entries
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# 🔹 Live encounter updates go through this channel layer. The in-memory layer only
+# reaches sockets served by the same process; for several nodes point
+# CHANNEL_LAYER_BACKEND at e.g. channels_redis.core.RedisChannelLayer and list
+# its servers in CHANNEL_LAYER_HOSTS
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': config('CHANNEL_LAYER_BACKEND', default='channels.layers.InMemoryChannelLayer'),
+    }
+}
+CHANNEL_LAYER_HOSTS = config('CHANNEL_LAYER_HOSTS', default='', cast=lambda v: [h for h in v.split(',') if h])
+if CHANNEL_LAYER_HOSTS:
+    CHANNEL_LAYERS['default']['CONFIG'] = {'hosts': CHANNEL_LAYER_HOSTS}
+
+# 🔹 Request metrics, scraped from /api/metrics/ with METRICS_TOKEN as a bearer token.
+# With several worker processes set PROMETHEUS_MULTIPROC_DIR to an empty directory
+# they can all write to; it has to be in the environment before any metric exists
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -79,6 +138,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # 🔹 DATABASES configuration based on environment
 if ENVIRONMENT == "docker":
@@ -104,6 +164,31 @@ else:
         }
     }
 
+# 🔹 Connection reuse. By default every worker process keeps a psycopg 3 pool of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections that requests borrow from, which is
+# what the ASGI image needs. With DB_POOL=False each thread keeps its own
+# connection for DB_CONN_MAX_AGE seconds; leave that at 0 under ASGI, where every
+# request context would otherwise hold a connection open. Either way a connection
+# is checked before it is reused
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0, cast=int)
+
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL:
+        database['OPTIONS'] = {
+            'pool': {'min_size': DB_POOL_MIN_SIZE, 'max_size': DB_POOL_MAX_SIZE, 'timeout': DB_POOL_TIMEOUT},
+        }
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
+# 🔹 Compendium and encounter detail reads are served by async views when enabled;
+# worth it under ASGI, where sync views share one thread per process
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=True, cast=bool)
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -0,0 +1,190 @@
+import io
+import os
+import runpy
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from compendium.models import Monster, Spell
+from compendium.views import MonsterViewSet, SpellViewSet
+from player_characters.models import PlayerCharacter
+from player_characters.serializers import PlayerCharacterSerializer
+from player_characters.views import PlayerCharacterViewSet
+
+from .renderers import ORJSONRenderer
+
+
+def create_fixtures():
+    """Rows covering the value kinds the fast path has to reproduce: nulls, floats, lists and unicode."""
+    user = User.objects.create_user('parity', password='parity-password')
+    Monster.objects.create(
+        name='Goblin', url='https://example.com/goblin', cr='1/4', type='humanoid', ac=15, hp=7,
+        size='Small', speed='30 ft.', alignment='neutral evil', source='Monster Manual',
+        strength=8, dexterity=14, constitution=10, intelligence=10, wisdom=8, charisma=8,
+    )
+    Monster.objects.create(
+        name='Ancient Red Dragon', url='https://example.com/dragon', cr='24', type='dragon', ac=22, hp=546,
+        legendary=True, strength=30,
+    )
+    Monster.objects.create(name='Mystery Beast', url='https://example.com/beast', cr='?', type='beast', ac=10, hp=1)
+    Spell.objects.create(
+        name='Fireball', classes=['Sorcerer', 'Wizard'], level=3, school='Evocation', cast_time='1 action',
+        range='150 feet', duration='Instantaneous', verbal=True, somatic=True, material=True,
+        material_cost='A tiny ball of bat guano and sulfur',
+        description='Each creature in a 20-foot-radius sphere must make a Dexterity saving throw. '
+                    'A target takes 8d6 fire damage on a failed save.',
+    )
+    Spell.objects.create(
+        name='Mage Hand', classes=[], level=0, school='Conjuration', cast_time='1 action', range='30 feet',
+        duration='1 minute', description='A spectral, floating hand appears — “unique” text included.',
+    )
+    PlayerCharacter.objects.create(
+        user=user, character_name='Ærin', player_name=None, character_race='Elf', ac=14, hp=None,
+        info='Multi\nline',
+    )
+    PlayerCharacter.objects.create(user=user)
+    return user
+
+
+class ValuesListParityTests(TestCase):
+    """The ValuesListMixin fast path must render exactly what the serializer does."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_fixtures()
+
+    def assertFastPathMatches(self, viewset, queryset):
+        view = viewset(request=None, format_kwarg=None, kwargs={}, action='list')
+        plan = view.get_values_plan()
+        expected = view.get_serializer(queryset, many=True).data
+        actual = view.values_to_representation(view.values_queryset(queryset, plan), plan)
+        self.assertEqual(len(actual), queryset.count())
+        for expected_row, actual_row in zip(expected, actual):
+            self.assertEqual(ORJSONRenderer().render(actual_row), JSONRenderer().render(expected_row))
+
+    def test_monsters(self):
+        self.assertFastPathMatches(MonsterViewSet, Monster.objects.order_by('pk'))
+
+    def test_spells(self):
+        self.assertFastPathMatches(SpellViewSet, Spell.objects.order_by('pk'))
+
+    def test_player_characters(self):
+        self.assertFastPathMatches(PlayerCharacterViewSet, PlayerCharacter.objects.order_by('pk'))
+
+    def test_check_fast_read_command(self):
+        output = io.StringIO()
+        call_command('check_fast_read', stdout=output)
+        for viewset in ('MonsterViewSet', 'SpellViewSet', 'PlayerCharacterViewSet'):
+            self.assertIn(f'{viewset}:', output.getvalue())
+        self.assertNotIn('differs', output.getvalue())
+
+
+class ValuesListEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = create_fixtures()
+        self.client.force_authenticate(self.user)
+
+    def test_player_character_list_matches_the_serializer(self):
+        response = self.client.get('/api/characters/')
+        self.assertEqual(response.status_code, 200)
+        expected = PlayerCharacterSerializer(PlayerCharacter.objects.order_by('pk'), many=True).data
+        self.assertEqual(sorted(response.json(), key=lambda row: row['id']), [dict(row) for row in expected])
+
+
+class HealthCheckTests(TestCase):
+    url = '/api/health/'
+
+    def test_reachable_databases_are_healthy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['status'], 'ok')
+        self.assertEqual(body['databases']['default']['status'], 'ok')
+        if connections['default'].pool is not None:
+            self.assertIn('pool_available', body['databases']['default']['pool'])
+
+    def test_unreachable_database_answers_503(self):
+        connection = connections['default']
+        with mock.patch.object(connection, 'cursor', side_effect=OperationalError('connection refused')):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        body = response.json()
+        self.assertEqual(body['status'], 'error')
+        self.assertEqual(body['databases']['default']['status'], 'error')
+        self.assertEqual(body['databases']['default']['error'], 'connection refused')
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+    url = '/api/metrics/'
+
+    def setUp(self):
+        self.staff = User.objects.create_user('ops', password='ops-password', is_staff=True)
+        self.player = User.objects.create_user('player', password='player-password')
+
+    def scrape(self, credentials=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {credentials}'} if credentials else {}
+        return self.client.get(self.url, **headers)
+
+    def test_requests_are_recorded_per_view_and_method(self):
+        labels = {'view': 'health', 'method': 'GET'}
+        before = REGISTRY.get_sample_value('http_request_db_queries_count', labels) or 0
+        self.client.get('/api/health/')
+        self.assertEqual(REGISTRY.get_sample_value('http_request_db_queries_count', labels), before + 1)
+        self.assertGreater(REGISTRY.get_sample_value('http_request_db_queries_sum', labels), 0)
+
+    def test_unknown_paths_share_one_label(self):
+        labels = {'view': 'unresolved', 'method': 'GET'}
+        before = REGISTRY.get_sample_value('http_request_duration_seconds_count', labels) or 0
+        self.client.get('/no/such/page/')
+        self.client.get('/another/missing/page/')
+        self.assertEqual(REGISTRY.get_sample_value('http_request_duration_seconds_count', labels), before + 2)
+
+    def test_scrape_token(self):
+        response = self.scrape('scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.content)
+        self.assertEqual(self.scrape('wrong-token').status_code, 401)
+        self.assertEqual(self.scrape().status_code, 401)
+
+    def test_staff_access_tokens(self):
+        self.assertEqual(self.scrape(AccessToken.for_user(self.staff)).status_code, 200)
+        self.assertEqual(self.scrape(AccessToken.for_user(self.player)).status_code, 401)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_setting_is_not_a_password(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+
+class GunicornHooksTests(SimpleTestCase):
+    def setUp(self):
+        self.hooks = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_starting_empties_the_multiprocess_directory(self):
+        stale = Path(self.directory.name) / 'histogram_123.db'
+        stale.touch()
+        with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': self.directory.name}):
+            self.hooks['on_starting'](server=None)
+        self.assertFalse(stale.exists())
+        self.assertTrue(Path(self.directory.name).is_dir())
+
+    def test_exited_workers_are_marked_dead(self):
+        worker = mock.Mock(pid=4321)
+        with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': self.directory.name}), \
+                mock.patch('prometheus_client.multiprocess.mark_process_dead') as mark_process_dead:
+            self.hooks['child_exit'](server=None, worker=worker)
+        mark_process_dead.assert_called_once_with(4321)
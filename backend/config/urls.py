@@ -2,13 +2,19 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from config.health import health_view
+from config.metrics import metrics_view
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/metrics/', metrics_view, name='metrics'),
+    path('api/health/', health_view, name='health'),
     path('api/', include('sign_in.urls')),
     path('api/', include('compendium.urls')),
     path('api/', include('player_characters.urls')),
     path('api/', include('encounters.urls')),
+    path('api/', include('dice.urls')),
 ]
\ No newline at end of file
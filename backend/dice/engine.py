@@ -0,0 +1,140 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+MAX_DICE = 1000
+MAX_SIDES = 1000
+# Keeps totals far inside int64, whatever mix of dice and constants an expression holds
+MAX_CONSTANT = 1000000
+
+TERM_PATTERN = re.compile(
+    r'\s*(?P<sign>[+-])?\s*(?:(?P<count>\d*)d(?P<sides>\d+)(?:(?P<keep>kh|kl|dh|dl|k|d)(?P<keep_count>\d+))?|(?P<constant>\d+))',
+    re.IGNORECASE,
+)
+
+
+class DiceExpressionError(ValueError):
+    pass
+
+
+class DiceTerm:
+    """``count`` dice with ``sides`` faces, optionally keeping only the highest or lowest ``keep``."""
+
+    def __init__(self, sign, count, sides, keep=None, keep_highest=True):
+        self.sign = sign
+        self.count = count
+        self.sides = sides
+        self.keep = keep
+        self.keep_highest = keep_highest
+
+    @property
+    def kept(self):
+        return self.count if self.keep is None else self.keep
+
+    def roll(self, times, rng):
+        if self.kept == 0:
+            # Every die is dropped, so there is nothing to roll
+            return np.zeros(times, dtype=np.int64)
+        faces = rng.integers(1, self.sides + 1, (times, self.count))
+        if self.keep is not None and self.keep < self.count:
+            faces = np.sort(faces, axis=1)
+            faces = faces[:, self.count - self.keep:] if self.keep_highest else faces[:, :self.keep]
+        return self.sign * faces.sum(axis=1)
+
+    def __str__(self):
+        keep = '' if self.keep is None else f"{'kh' if self.keep_highest else 'kl'}{self.keep}"
+        return f"{'-' if self.sign < 0 else '+'}{self.count}d{self.sides}{keep}"
+
+
+class CompiledExpression:
+    def __init__(self, terms, constant):
+        self.terms = terms
+        self.constant = constant
+
+    @property
+    def dice(self):
+        """Number of dice thrown per roll, which is what the memory of a roll scales with."""
+        return sum(term.count for term in self.terms if term.kept)
+
+    @property
+    def minimum(self):
+        return self.constant + sum(
+            term.kept if term.sign > 0 else -term.kept * term.sides for term in self.terms
+        )
+
+    @property
+    def maximum(self):
+        return self.constant + sum(
+            term.kept * term.sides if term.sign > 0 else -term.kept for term in self.terms
+        )
+
+    def roll(self, times, rng=None):
+        """Roll the expression ``times`` times and return the totals as an array."""
+        rng = rng if rng is not None else np.random.default_rng()
+        totals = np.full(times, self.constant, dtype=np.int64)
+        for term in self.terms:
+            totals += term.roll(times, rng)
+        return totals
+
+    def __str__(self):
+        parts = [str(term) for term in self.terms]
+        if self.constant:
+            parts.append(f"{self.constant:+d}")
+        return ''.join(parts).lstrip('+') or '0'
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression):
+    """
+    Parse a dice expression such as ``4d6kh3+2``, ``2d8+1d6`` or ``d20-1``.
+
+    ``kh``/``k`` keep the highest dice, ``kl`` the lowest, and ``dl``/``d`` and
+    ``dh`` drop the lowest or highest. Results are memoized, so repeated
+    expressions are only parsed once. Whitespace is allowed around ``+`` and
+    ``-`` but not inside a term, so ``2d6 3`` is an error rather than ``2d63``.
+    """
+    text = expression.strip().lower()
+    if not text:
+        raise DiceExpressionError("Empty dice expression.")
+
+    terms = []
+    constant = 0
+    position = 0
+    while position < len(text):
+        match = TERM_PATTERN.match(text, position)
+        if not match or match.end() == position or (position > 0 and not match.group('sign')):
+            raise DiceExpressionError(f"Invalid dice expression '{expression}' at position {position}.")
+        position = match.end()
+
+        sign = -1 if match.group('sign') == '-' else 1
+        if match.group('constant') is not None:
+            constant += sign * int(match.group('constant'))
+            if abs(constant) > MAX_CONSTANT:
+                raise DiceExpressionError(f"Constants must add up to at most {MAX_CONSTANT} either way.")
+            continue
+
+        count = int(match.group('count') or 1)
+        sides = int(match.group('sides'))
+        if not 1 <= count <= MAX_DICE or not 1 <= sides <= MAX_SIDES:
+            raise DiceExpressionError(
+                f"Dice must be between 1d1 and {MAX_DICE}d{MAX_SIDES}, got {count}d{sides}."
+            )
+
+        keep, keep_highest = None, True
+        if match.group('keep'):
+            mode = match.group('keep')
+            amount = int(match.group('keep_count'))
+            if amount > count:
+                raise DiceExpressionError(f"Cannot keep or drop {amount} of {count} dice.")
+            if mode in ('kh', 'k'):
+                keep, keep_highest = amount, True
+            elif mode == 'kl':
+                keep, keep_highest = amount, False
+            elif mode in ('dl', 'd'):
+                keep, keep_highest = count - amount, True
+            else:
+                keep, keep_highest = count - amount, False
+        terms.append(DiceTerm(sign, count, sides, keep, keep_highest))
+
+    return CompiledExpression(tuple(terms), constant)
@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from .engine import DiceExpressionError, compile_expression
+
+MAX_TOTAL_ROLLS = 100000
+# Each die thrown takes a few bytes while a roll is evaluated, so this bounds a request's memory
+MAX_TOTAL_DICE = 1000000
+
+
+class DiceRollSerializer(serializers.Serializer):
+    expression = serializers.CharField(max_length=100)
+    times = serializers.IntegerField(min_value=1, max_value=MAX_TOTAL_ROLLS, default=1)
+    label = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate_expression(self, value):
+        try:
+            compile_expression(value)
+        except DiceExpressionError as error:
+            raise serializers.ValidationError(str(error))
+        return value
+
+
+class DiceBatchSerializer(serializers.Serializer):
+    rolls = DiceRollSerializer(many=True, allow_empty=False, max_length=500)
+    seed = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+
+    def validate_rolls(self, value):
+        total = sum(roll['times'] for roll in value)
+        if total > MAX_TOTAL_ROLLS:
+            raise serializers.ValidationError(f"At most {MAX_TOTAL_ROLLS} rolls per request, got {total}.")
+        dice = sum(roll['times'] * compile_expression(roll['expression']).dice for roll in value)
+        if dice > MAX_TOTAL_DICE:
+            raise serializers.ValidationError(
+                f"At most {MAX_TOTAL_DICE} dice per request, got {dice}; lower the dice count or times."
+            )
+        return value
@@ -0,0 +1,78 @@
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from .engine import MAX_CONSTANT, DiceExpressionError, compile_expression
+from .serializers import MAX_TOTAL_DICE, DiceBatchSerializer
+
+
+class DiceEngineTests(SimpleTestCase):
+    def roll(self, expression, times=2000):
+        compiled = compile_expression(expression)
+        return compiled, compiled.roll(times, np.random.default_rng(0))
+
+    def assert_within_bounds(self, expression):
+        compiled, totals = self.roll(expression)
+        self.assertGreaterEqual(totals.min(), compiled.minimum, expression)
+        self.assertLessEqual(totals.max(), compiled.maximum, expression)
+
+    def test_rolls_stay_within_bounds(self):
+        for expression in ('d20', '2d8+1d6+3', '4d6kh3', '4d6kl1', '4d6dl1', '4d6dh3', '2d20k1-1', '-1d4+10'):
+            self.assert_within_bounds(expression)
+
+    def test_keeping_or_dropping_every_die(self):
+        for expression in ('4d6dl4', '4d6kh0', '4d6kl0', '4d6dh4'):
+            compiled, totals = self.roll(expression)
+            self.assertEqual((compiled.minimum, compiled.maximum), (0, 0), expression)
+            self.assertFalse(totals.any(), expression)
+            self.assertEqual(compiled.dice, 0)
+
+    def test_keep_highest_matches_sorted_faces(self):
+        _, totals = self.roll('4d6kh3', times=20000)
+        # The mean of the best three of 4d6 is about 12.24, well above 3d6's 10.5
+        self.assertAlmostEqual(totals.mean(), 12.24, delta=0.1)
+
+    def test_constants_are_bounded(self):
+        self.assertEqual(compile_expression(f'1d6+{MAX_CONSTANT}').constant, MAX_CONSTANT)
+        for expression in ('1d6+99999999999999999999', '1d6+9223372036854775807', f'{MAX_CONSTANT}+1', '-1000000-1'):
+            with self.subTest(expression=expression), self.assertRaises(DiceExpressionError):
+                compile_expression(expression)
+
+    def test_whitespace(self):
+        self.assertEqual(str(compile_expression(' 2d6 + 3 ')), '2d6+3')
+        for expression in ('2d6 3', '2 d6', '2d 6', '4d6 kh3'):
+            with self.subTest(expression=expression), self.assertRaises(DiceExpressionError):
+                compile_expression(expression)
+
+
+class DiceBatchSerializerTests(SimpleTestCase):
+    def test_rejects_requests_over_the_dice_limit(self):
+        serializer = DiceBatchSerializer(data={'rolls': [
+            {'expression': '1000d6', 'times': 600},
+            {'expression': '1000d6', 'times': 600},
+        ]})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn(str(MAX_TOTAL_DICE), str(serializer.errors['rolls']))
+
+    def test_accepts_requests_within_the_limits(self):
+        serializer = DiceBatchSerializer(data={'rolls': [{'expression': '4d6kh3', 'times': 1000}]})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class DiceRollViewTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('roller', password='roller-password'))
+
+    def roll(self, **data):
+        return self.client.post('/api/dice/roll/', {'rolls': [{'expression': '2d6', 'times': 5}], **data}, format='json')
+
+    def test_negative_seeds_are_rejected(self):
+        response = self.roll(seed=-1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('seed', response.data)
+
+    def test_a_seed_repeats_the_rolls(self):
+        first, second = self.roll(seed=0), self.roll(seed=0)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data, second.data)
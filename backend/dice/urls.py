@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import DiceRollView
+
+urlpatterns = [
+    path('dice/roll/', DiceRollView.as_view(), name='dice-roll'),
+]
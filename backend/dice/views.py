@@ -0,0 +1,38 @@
+import numpy as np
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .engine import compile_expression
+from .serializers import DiceBatchSerializer
+
+
+class DiceRollView(APIView):
+    """
+    Roll many dice expressions in one request.
+
+    Each expression is compiled once (and memoized across requests), then all
+    of its repetitions are rolled together as a single NumPy batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = DiceBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        rng = np.random.default_rng(data.get('seed'))
+
+        results = []
+        for roll in data['rolls']:
+            compiled = compile_expression(roll['expression'])
+            totals = compiled.roll(roll['times'], rng)
+            results.append({
+                'expression': roll['expression'],
+                'normalized': str(compiled),
+                'label': roll.get('label', ''),
+                'min': compiled.minimum,
+                'max': compiled.maximum,
+                'rolls': totals.tolist(),
+                'total': int(totals.sum()),
+            })
+        return Response({'results': results})
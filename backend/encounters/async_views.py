@@ -0,0 +1,39 @@
+from django.http import HttpResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from config.async_views import with_async_reads
+from config.renderers import ORJSONRenderer
+from sign_in.authentication import CachedJWTAuthentication
+
+from .serializers import EncounterSerializer
+from .views import EncounterViewSet
+
+
+async def owned_encounter_read(request, renderer_format, pk):
+    """
+    Serve one of the requesting user's encounters with its participants as
+    JSON, or return None and let the viewset produce the response.
+    """
+    if renderer_format != ORJSONRenderer.format:
+        return None
+    try:
+        authenticated = await CachedJWTAuthentication().aauthenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if authenticated is None:
+        return None
+
+    encounter = await EncounterViewSet.queryset.filter(user=authenticated[0], pk=pk).afirst()
+    if encounter is None:
+        return None
+
+    renderer = ORJSONRenderer()
+    response = HttpResponse(renderer.render(EncounterSerializer(encounter).data), content_type=renderer.media_type)
+    response['Vary'] = 'Accept'
+    return response
+
+
+encounter_detail = with_async_reads(
+    EncounterViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
+    owned_encounter_read,
+)
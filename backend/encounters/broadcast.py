@@ -0,0 +1,34 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+PARTICIPANT_FIELDS = ('id', 'name', 'initiative', 'current_hp', 'ac', 'notes')
+
+
+def encounter_group(encounter_id):
+    return f"encounter_{encounter_id}"
+
+
+def participant_row(kind, participant):
+    return {'kind': kind, **{field: getattr(participant, field) for field in PARTICIPANT_FIELDS}}
+
+
+def broadcast_participants(encounter_id, changed=(), removed=()):
+    """
+    Send participant changes to everyone watching the encounter once the
+    current transaction commits.
+
+    ``changed`` holds participant rows as returned by ``participant_row`` and
+    ``removed`` holds ``{'kind', 'id'}`` pairs of deleted participants.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not (changed or removed):
+        return
+    message = {
+        'type': 'participants.changed',
+        'encounter': encounter_id,
+        'changed': list(changed),
+        'removed': list(removed),
+    }
+    group = encounter_group(encounter_id)
+    transaction.on_commit(lambda: async_to_sync(channel_layer.group_send)(group, message))
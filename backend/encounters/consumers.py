@@ -0,0 +1,48 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .broadcast import encounter_group
+from .models import Encounter
+
+# Close codes sent before the socket is accepted
+UNAUTHORIZED = 4401
+NOT_FOUND = 4404
+
+
+class EncounterConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams participant changes of one of the user's encounters.
+
+    Each message has ``changed`` (full participant rows, tagged with ``kind``)
+    and ``removed`` (``kind`` and ``id`` of deleted participants).
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=UNAUTHORIZED)
+            return
+
+        self.encounter_id = int(self.scope['url_route']['kwargs']['encounter_id'])
+        if not await self.owns_encounter(user):
+            await self.close(code=NOT_FOUND)
+            return
+
+        self.group_name = encounter_group(self.encounter_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def participants_changed(self, event):
+        await self.send_json({
+            'encounter': event['encounter'],
+            'changed': event['changed'],
+            'removed': event['removed'],
+        })
+
+    @database_sync_to_async
+    def owns_encounter(self, user):
+        return Encounter.objects.filter(id=self.encounter_id, user=user).exists()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from compendium.challenge_ratings import CR_XP
+
+DIFFICULTIES = ('trivial', 'easy', 'medium', 'hard', 'deadly')
+
+# Per-character XP thresholds (easy, medium, hard, deadly), indexed by level; row 0 is unused
+XP_THRESHOLDS = np.array([
+    [0, 0, 0, 0],
+    [25, 50, 75, 100],
+    [50, 100, 150, 200],
+    [75, 150, 225, 300],
+    [125, 250, 375, 500],
+    [250, 500, 750, 1100],
+    [300, 600, 900, 1400],
+    [350, 750, 1100, 1700],
+    [450, 900, 1400, 2100],
+    [550, 1100, 1600, 2400],
+    [600, 1200, 1900, 2800],
+    [800, 1600, 2400, 3600],
+    [1000, 2000, 3000, 4500],
+    [1100, 2200, 3400, 5100],
+    [1250, 2500, 3800, 5700],
+    [1400, 2800, 4300, 6400],
+    [1600, 3200, 4800, 7200],
+    [2000, 4100, 6100, 9200],
+    [2100, 4900, 7300, 10900],
+    [2400, 5700, 8500, 12700],
+    [2800, 6600, 9900, 14800],
+], dtype=np.int64)
+
+MAX_LEVEL = len(XP_THRESHOLDS) - 1
+
+# Encounter multipliers for groups of monsters, and the smallest monster count
+# each standard step applies to (1, 2, 3-6, 7-10, 11-14, 15+). The 0.5 and 5
+# steps are only reached through the party size adjustment.
+MULTIPLIERS = np.array([0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0])
+MULTIPLIER_COUNT_STEPS = np.array([1, 2, 3, 7, 11, 15])
+
+
+def party_thresholds(levels):
+    """Sum the easy/medium/hard/deadly thresholds of a party given its character levels."""
+    levels = np.clip(np.asarray(levels, dtype=np.int64), 0, MAX_LEVEL)
+    return XP_THRESHOLDS[levels].sum(axis=0)
+
+
+def encounter_multipliers(monster_counts, party_size):
+    """
+    Vectorized encounter multiplier for an array of monster counts.
+
+    Parties of fewer than three characters use the next higher multiplier,
+    parties of six or more the next lower one.
+    """
+    counts = np.asarray(monster_counts)
+    steps = np.searchsorted(MULTIPLIER_COUNT_STEPS, counts, side='right')
+    if party_size < 3:
+        steps = steps + 1
+    elif party_size >= 6:
+        steps = steps - 1
+    multipliers = MULTIPLIERS[np.clip(steps, 0, len(MULTIPLIERS) - 1)]
+    return np.where(counts > 0, multipliers, 0.0)
+
+
+def score_encounters(levels, monster_xp, monster_counts, encounter_index, n_encounters):
+    """
+    Score many encounters against one party in a single pass.
+
+    ``monster_xp``, ``monster_counts`` and ``encounter_index`` are parallel
+    arrays with one entry per monster group: its XP value, how many of it
+    there are and which encounter (0 ... n_encounters - 1) it belongs to.
+    Returns a dict of arrays with one entry per encounter.
+    """
+    thresholds = party_thresholds(levels)
+    monster_xp = np.asarray(monster_xp, dtype=np.float64)
+    monster_counts = np.asarray(monster_counts, dtype=np.float64)
+    encounter_index = np.asarray(encounter_index, dtype=np.int64)
+
+    base_xp = np.bincount(encounter_index, weights=monster_xp * monster_counts, minlength=n_encounters)
+    counts = np.bincount(encounter_index, weights=monster_counts, minlength=n_encounters).astype(np.int64)
+    multipliers = encounter_multipliers(counts, len(levels))
+    adjusted_xp = base_xp * multipliers
+
+    return {
+        'thresholds': thresholds,
+        'base_xp': base_xp.astype(np.int64),
+        'monster_count': counts,
+        'multiplier': multipliers,
+        'adjusted_xp': adjusted_xp,
+        'difficulty': np.searchsorted(thresholds, adjusted_xp, side='right'),
+    }
+
+
+def cr_to_xp(cr):
+    return CR_XP.get(str(cr).strip(), 0)
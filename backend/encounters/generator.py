@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+
+from .difficulty import DIFFICULTIES, encounter_multipliers, party_thresholds, score_encounters
+
+DEADLY_CAP = 1.5
+
+
+class EncounterGenerator:
+    """
+    Finds monster combinations whose adjusted XP lands in a difficulty band.
+
+    Candidate monsters are bucketed by XP value, so the search runs over the
+    few dozen distinct XP values instead of every monster. For each monster
+    count the band is turned into a base XP window (dividing by that count's
+    multiplier), and a depth-first search over the buckets, pruned by the
+    window bounds, collects multisets of XP values until ``time_budget``
+    seconds have passed. Survivors are scored with the difficulty engine and
+    filled in with concrete monsters picked at random from each bucket.
+    """
+
+    def __init__(self, levels, difficulty, max_monsters=8, max_groups=3,
+                 options=5, time_budget=0.25, seed=None):
+        self.levels = list(levels)
+        self.target = DIFFICULTIES.index(difficulty)
+        self.max_monsters = max_monsters
+        self.max_groups = max_groups
+        self.options = options
+        self.time_budget = time_budget
+        self.rng = np.random.default_rng(seed)
+
+        self.thresholds = party_thresholds(self.levels)
+        self.multipliers = encounter_multipliers(np.arange(1, max_monsters + 1), len(self.levels))
+        self.buckets = {}
+
+    @property
+    def band(self):
+        """
+        Adjusted XP range [low, high) for the target difficulty. Trivial has no
+        lower threshold and starts at 0; deadly has no upper threshold, so it is
+        capped at one and a half times the deadly one.
+        """
+        # thresholds[i] is where difficulty i + 1 starts
+        low = self.thresholds[self.target - 1] if self.target > 0 else 0
+        if self.target < len(self.thresholds):
+            high = self.thresholds[self.target]
+        else:
+            high = low * DEADLY_CAP
+        return float(low), float(high)
+
+    @property
+    def max_monster_xp(self):
+        """No single monster worth this much XP or more can appear in a result."""
+        return self.band[1] / self.multipliers.min()
+
+    def generate(self, monsters):
+        """Return up to ``options`` combinations built from ``monsters`` (dicts with an ``xp`` key)."""
+        self.buckets = {}
+        for monster in monsters:
+            self.buckets.setdefault(monster['xp'], []).append(monster)
+
+        low, high = self.band
+        values = np.array(sorted(self.buckets, reverse=True), dtype=np.int64)
+        if not len(values):
+            return []
+
+        deadline = time.perf_counter() + self.time_budget
+        counts = np.arange(1, self.max_monsters + 1)
+        per_count = self.options * 2
+
+        combos = []
+        for count in self.rng.permutation(counts):
+            multiplier = self.multipliers[count - 1]
+            found = []
+            self._search(values, int(count), (low / multiplier, high / multiplier), [], 0, found,
+                         deadline, per_count)
+            combos += found
+            if time.perf_counter() > deadline:
+                break
+
+        return self._rank(combos)
+
+    def _search(self, values, remaining, window, picked, total, found, deadline, wanted):
+        low, high = window
+        if remaining == 0:
+            if low <= total < high:
+                found.append(list(picked))
+            return
+        if not len(values) or len(picked) >= self.max_groups or len(found) >= wanted:
+            return
+        if time.perf_counter() > deadline:
+            return
+
+        # Values are sorted descending, which is what makes the pruning below valid.
+        # The first group is tried in random order so repeated calls vary the leader.
+        positions = self.rng.permutation(len(values)) if not picked else range(len(values))
+        smallest = values[-1]
+        for i in positions:
+            value = values[i]
+            if total + value + smallest * (remaining - 1) >= high:
+                continue
+            if total + value * remaining < low:
+                if picked:
+                    break
+                continue
+            for amount in range(remaining, 0, -1):
+                if total + value * amount >= high:
+                    continue
+                picked.append((int(value), amount))
+                self._search(values[i + 1:], remaining - amount, window, picked,
+                             total + value * amount, found, deadline, wanted)
+                picked.pop()
+                if len(found) >= wanted:
+                    return
+
+    def _rank(self, combos):
+        if not combos:
+            return []
+        index, xp, amounts = [], [], []
+        for position, combo in enumerate(combos):
+            for value, amount in combo:
+                index.append(position)
+                xp.append(value)
+                amounts.append(amount)
+        scores = score_encounters(self.levels, xp, amounts, index, len(combos))
+
+        low, high = self.band
+        middle = (low + high) / 2
+        matching = np.flatnonzero(scores['difficulty'] == self.target)
+        ranked = matching[np.argsort(np.abs(scores['adjusted_xp'][matching] - middle), kind='stable')]
+
+        results = []
+        seen = set()
+        for position in ranked:
+            key = tuple(sorted(combos[position]))
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append({
+                'monsters': [
+                    {**self._pick(value), 'count': amount} for value, amount in combos[position]
+                ],
+                'monster_count': int(scores['monster_count'][position]),
+                'base_xp': int(scores['base_xp'][position]),
+                'multiplier': float(scores['multiplier'][position]),
+                'adjusted_xp': float(scores['adjusted_xp'][position]),
+                'difficulty': DIFFICULTIES[self.target],
+            })
+            if len(results) >= self.options:
+                break
+        return results
+
+    def _pick(self, xp):
+        bucket = self.buckets[xp]
+        return bucket[self.rng.integers(len(bucket))]
@@ -0,0 +1,186 @@
+import random
+import re
+import time
+from bisect import bisect_right
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import BigIntegerField, Max
+from django.db.models.functions import Cast, Substr
+
+from compendium.models import Monster
+from encounters.models import Encounter, MonsterEncounterData, PlayerEncounterData
+from player_characters.models import PlayerCharacter
+
+FIRST_PARTS = ['Ar', 'Bel', 'Cor', 'Da', 'El', 'Fen', 'Gar', 'Hal', 'Is', 'Jor', 'Kel', 'Lir', 'Mor', 'Nym',
+               'Or', 'Per', 'Quin', 'Ros', 'Syl', 'Tor', 'Ul', 'Vae', 'Wil', 'Xan', 'Yor', 'Zar']
+LAST_PARTS = ['a', 'an', 'wen', 'ric', 'dor', 'iel', 'mir', 'ra', 'thas', 'vyn', 'ius', 'eth']
+RACES = ['Human', 'Elf', 'Dwarf', 'Halfling', 'Gnome', 'Half-Orc', 'Half-Elf', 'Tiefling', 'Dragonborn']
+CLASSES = ['Barbarian', 'Bard', 'Cleric', 'Druid', 'Fighter', 'Monk', 'Paladin', 'Ranger', 'Rogue',
+           'Sorcerer', 'Warlock', 'Wizard']
+HIT_DIE_AVERAGE = {'Barbarian': 7, 'Fighter': 6, 'Paladin': 6, 'Ranger': 6, 'Sorcerer': 4, 'Wizard': 4}
+ENCOUNTER_ADJECTIVES = ['Ambush', 'Siege', 'Skirmish', 'Raid', 'Showdown', 'Patrol', 'Last Stand', 'Hunt']
+ENCOUNTER_PLACES = ['at the Ford', 'in the Crypt', 'on the Road', 'in the Mines', 'at the Keep',
+                    'in the Swamp', 'under the Mountain', 'at the Docks']
+# Low levels are far more common than high ones in real campaigns
+LEVEL_WEIGHTS = [20 - level // 2 for level in range(1, 21)]
+
+
+def next_user_number(prefix):
+    """One past the highest ``<prefix><number>`` username, so new users never take an existing name."""
+    highest = (
+        User.objects.filter(username__regex=rf'^{re.escape(prefix)}[0-9]+$')
+        .annotate(number=Cast(Substr('username', len(prefix) + 1), BigIntegerField()))
+        .aggregate(Max('number'))['number__max']
+    )
+    return 0 if highest is None else highest + 1
+
+
+def _around(rng, average):
+    """A random count with the given mean, never negative."""
+    return rng.randint(0, 2 * average) if average else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate seeded synthetic users, player characters, encounters and encounter participants '
+        'for scale testing. Monsters come from the compendium, so load it first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users to create')
+        parser.add_argument('--characters_per_user', type=int, default=10,
+                            help='Average number of player characters per user')
+        parser.add_argument('--encounters_per_user', type=int, default=10,
+                            help='Average number of encounters per user')
+        parser.add_argument('--players_per_encounter', type=int, default=4,
+                            help='Most of the user\'s characters taking part in one encounter')
+        parser.add_argument('--monsters_per_encounter', type=int, default=10,
+                            help='Average number of monsters per encounter')
+        parser.add_argument('--batch_size', type=int, default=2000,
+                            help='Rows per INSERT; also bounds how many rows are held in memory')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, the same seed gives the same data')
+        parser.add_argument('--prefix', default='synthetic',
+                            help='Username prefix; every generated user has the prefix as password')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch_size must be at least 1")
+
+        # Sorted by CR so monsters up to a party's level can be found with bisect
+        self.monsters = sorted(
+            (cr_value, monster_id, name, hp, ac)
+            for monster_id, name, cr_value, hp, ac in Monster.objects.filter(cr_value__isnull=False)
+            .values_list('id', 'name', 'cr_value', 'hp', 'ac')
+        )
+        if not self.monsters:
+            raise CommandError("The compendium has no monsters, run load_monster_data first")
+        self.monster_crs = [monster[0] for monster in self.monsters]
+
+        prefix = options['prefix']
+        offset = next_user_number(prefix)
+        self.password = make_password(prefix)
+
+        # Each user brings roughly this many character and encounter rows, so a chunk
+        # of users keeps the objects held in memory around batch_size
+        rows_per_user = 1 + options['characters_per_user'] + options['encounters_per_user']
+        users_per_chunk = max(1, batch_size // rows_per_user)
+
+        started = time.perf_counter()
+        totals = dict.fromkeys(['users', 'characters', 'encounters', 'players', 'monsters'], 0)
+        for first in range(0, options['users'], users_per_chunk):
+            count = min(users_per_chunk, options['users'] - first)
+            with transaction.atomic():
+                for key, created in self.generate_chunk(prefix, offset + first, count).items():
+                    totals[key] += created
+            self.stdout.write(
+                f"  {first + count}/{options['users']} users, {totals['monsters']} monster rows "
+                f"({time.perf_counter() - started:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['users']} users, {totals['characters']} characters, "
+            f"{totals['encounters']} encounters, {totals['players']} player rows and "
+            f"{totals['monsters']} monster rows in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def generate_chunk(self, prefix, first, count):
+        options, rng, batch_size = self.options, self.rng, self.options['batch_size']
+
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}{first + i}", password=self.password) for i in range(count)
+        ], batch_size=batch_size)
+
+        characters = PlayerCharacter.objects.bulk_create([
+            self.make_character(user) for user in users
+            for _ in range(_around(rng, options['characters_per_user']))
+        ], batch_size=batch_size)
+        characters_by_user = {}
+        for character in characters:
+            characters_by_user.setdefault(character.user_id, []).append(character)
+
+        encounters = Encounter.objects.bulk_create([
+            Encounter(
+                user=user,
+                name=f"{rng.choice(ENCOUNTER_ADJECTIVES)} {rng.choice(ENCOUNTER_PLACES)}",
+                description=f"Synthetic encounter #{i + 1}",
+            )
+            for user in users for i in range(_around(rng, options['encounters_per_user']))
+        ], batch_size=batch_size)
+
+        players, monsters = [], []
+        created = {'players': 0, 'monsters': 0}
+        for encounter in encounters:
+            party = characters_by_user.get(encounter.user_id, [])
+            party = rng.sample(party, min(len(party), rng.randint(1, max(1, options['players_per_encounter']))))
+            for character in party:
+                players.append(PlayerEncounterData(
+                    encounter=encounter, player_character=character, initiative=rng.randint(1, 20),
+                    current_hp=character.hp, ac=character.ac,
+                ))
+            level = sum(character.character_level for character in party) / len(party) if party else 1
+            for _ in range(max(1, _around(rng, options['monsters_per_encounter']))):
+                monsters.append(self.make_monster(encounter, level))
+
+            # Flush as soon as a batch is full so memory stays bounded
+            if len(players) >= batch_size:
+                created['players'] += len(PlayerEncounterData.objects.bulk_create(players))
+                players = []
+            if len(monsters) >= batch_size:
+                created['monsters'] += len(MonsterEncounterData.objects.bulk_create(monsters))
+                monsters = []
+        created['players'] += len(PlayerEncounterData.objects.bulk_create(players))
+        created['monsters'] += len(MonsterEncounterData.objects.bulk_create(monsters))
+
+        return {'users': len(users), 'characters': len(characters), 'encounters': len(encounters), **created}
+
+    def make_character(self, user):
+        rng = self.rng
+        character_class = rng.choice(CLASSES)
+        level = rng.choices(range(1, 21), weights=LEVEL_WEIGHTS)[0]
+        return PlayerCharacter(
+            user=user,
+            character_name=f"{rng.choice(FIRST_PARTS)}{rng.choice(LAST_PARTS)}",
+            player_name=user.username,
+            character_level=level,
+            character_experience=0,
+            character_race=rng.choice(RACES),
+            character_class=character_class,
+            ac=rng.randint(11, 20),
+            hp=level * (HIT_DIE_AVERAGE.get(character_class, 5) + rng.randint(0, 3)),
+        )
+
+    def make_monster(self, encounter, level):
+        """A compendium monster with a CR no higher than the party's average level."""
+        cr_value, monster_id, name, hp, ac = self.monsters[
+            self.rng.randrange(max(1, bisect_right(self.monster_crs, level)))
+        ]
+        return MonsterEncounterData(
+            encounter=encounter, monster_id=monster_id, name=name,
+            initiative=self.rng.randint(1, 20), current_hp=hp, ac=ac,
+        )
@@ -1,10 +1,44 @@
-from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 from compendium.models import Monster
 from player_characters.models import PlayerCharacter
 
 
+SUMMARY_PREVIEW_NAMES = 3
+
+
+def _participant_count(model):
+    rows = model.objects.filter(encounter=OuterRef('pk')).order_by().values('encounter')
+    return Coalesce(Subquery(rows.annotate(count=Count('id')).values('count')), 0)
+
+
+def _participant_names(model, related):
+    rows = model.objects.filter(encounter=OuterRef('pk')).order_by('id')
+    names = rows.annotate(display_name=Coalesce(related, 'name')).values('display_name')
+    return ArraySubquery(names[:SUMMARY_PREVIEW_NAMES])
+
+
+class EncounterQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Annotate participant counts, total monster XP and the first few
+        participant names, as correlated subqueries so the whole list is still
+        a single query.
+        """
+        monster_xp = MonsterEncounterData.objects.filter(encounter=OuterRef('pk')).order_by().values('encounter')
+        return self.annotate(
+            player_count=_participant_count(PlayerEncounterData),
+            monster_count=_participant_count(MonsterEncounterData),
+            monster_xp=Coalesce(Subquery(monster_xp.annotate(total=Sum('monster__xp')).values('total')), 0),
+            player_names=_participant_names(PlayerEncounterData, 'player_character__character_name'),
+            monster_names=_participant_names(MonsterEncounterData, 'monster__name'),
+        )
+
+
 class Encounter(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
@@ -14,6 +48,8 @@ class Encounter(models.Model):
         related_name="encounters"
     )
 
+    objects = EncounterQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
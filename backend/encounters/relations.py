@@ -0,0 +1,70 @@
+from rest_framework import serializers
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that can be resolved from a map prepared by
+    ``BulkResolvingListSerializer`` instead of querying once per item.
+
+    With ``user_field`` set, only objects whose ``user_field`` is the
+    requesting user can be referenced.
+    """
+
+    def __init__(self, user_field=None, **kwargs):
+        self.user_field = user_field
+        self.resolved = None
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.user_field:
+            user = getattr(self.context.get('request'), 'user', None)
+            if user is None or not user.is_authenticated:
+                return queryset.none()
+            queryset = queryset.filter(**{self.user_field: user})
+        return queryset
+
+    def to_internal_value(self, data):
+        if self.resolved is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.pk_field.to_internal_value(data) if self.pk_field is not None else int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = self.resolved.get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class BulkResolvingListSerializer(serializers.ListSerializer):
+    """
+    Fetches every object referenced through the child's
+    ``BulkPrimaryKeyRelatedField``s with one ``id__in`` query per field before
+    validating the items, so validation costs the same for 1 or 50 items.
+    """
+
+    def to_internal_value(self, data):
+        fields = [
+            field for field in self.child.fields.values()
+            if isinstance(field, BulkPrimaryKeyRelatedField) and not field.read_only
+        ]
+        if isinstance(data, list):
+            for field in fields:
+                ids = set()
+                for item in data:
+                    value = item.get(field.field_name) if isinstance(item, dict) else None
+                    if value is None or isinstance(value, bool):
+                        continue
+                    try:
+                        ids.add(int(value))
+                    except (TypeError, ValueError):
+                        pass
+                field.resolved = field.get_queryset().in_bulk(ids) if ids else {}
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in fields:
+                field.resolved = None
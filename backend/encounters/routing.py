@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import EncounterConsumer
+
+websocket_urlpatterns = [
+    path('ws/encounters/<int:encounter_id>/', EncounterConsumer.as_asgi()),
+]
@@ -1,8 +1,14 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from compendium.models import Monster
 from player_characters.models import PlayerCharacter
+from .broadcast import broadcast_participants, participant_row
 from .models import Encounter, PlayerEncounterData, MonsterEncounterData
+from .relations import BulkPrimaryKeyRelatedField, BulkResolvingListSerializer
+
+# Participant fields an encounter update may change; the linked character or monster stays fixed
+PARTICIPANT_UPDATE_FIELDS = ['name', 'initiative', 'current_hp', 'ac', 'notes']
 
 
 class PlayerCharacterNestedSerializer(serializers.ModelSerializer):
@@ -20,8 +26,9 @@ class MonsterNestedSerializer(serializers.ModelSerializer):
 class PlayerEncounterDataSerializer(serializers.ModelSerializer):
     player_character = PlayerCharacterNestedSerializer(read_only=True)
 
-    player_character_id = serializers.PrimaryKeyRelatedField(
+    player_character_id = BulkPrimaryKeyRelatedField(
         queryset=PlayerCharacter.objects.all(),
+        user_field='user',
         source='player_character',
         required=False,
         allow_null=True
@@ -33,12 +40,13 @@ class PlayerEncounterDataSerializer(serializers.ModelSerializer):
         model = PlayerEncounterData
         fields = ["id", "player_character", "player_character_id", "name", "initiative", "current_hp", "ac",
                   "notes"]
+        list_serializer_class = BulkResolvingListSerializer
 
 
 class MonsterEncounterDataSerializer(serializers.ModelSerializer):
     monster = MonsterNestedSerializer(read_only=True)
 
-    monster_id = serializers.PrimaryKeyRelatedField(
+    monster_id = BulkPrimaryKeyRelatedField(
         queryset=Monster.objects.all(),
         source='monster',
         required=False,
@@ -50,6 +58,7 @@ class MonsterEncounterDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = MonsterEncounterData
         fields = ["id", "monster", "monster_id", "name", "initiative", "current_hp", "ac", "notes"]
+        list_serializer_class = BulkResolvingListSerializer
 
 
 class EncounterSerializer(serializers.ModelSerializer):
@@ -61,73 +70,194 @@ class EncounterSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "player_data", "monster_data", "user"]
         read_only_fields = ["user"]
 
+    @transaction.atomic
     def create(self, validated_data):
         player_data = validated_data.pop('player_data', [])
         monster_data = validated_data.pop('monster_data', [])
         encounter = Encounter.objects.create(**validated_data)
 
-        for player_item in player_data:
-            player_item.pop('id', None)
-            PlayerEncounterData.objects.create(encounter=encounter, **player_item)
-
-        for monster_item in monster_data:
-            monster_item.pop('id', None)
-            MonsterEncounterData.objects.create(encounter=encounter, **monster_item)
+        for model, items in ((PlayerEncounterData, player_data), (MonsterEncounterData, monster_data)):
+            rows = []
+            for item in items:
+                item.pop('id', None)
+                rows.append(model(encounter=encounter, **item))
+            model.objects.bulk_create(rows)
 
         return encounter
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        player_data = validated_data.pop('player_data', [])
-        monster_data = validated_data.pop('monster_data', [])
+        player_data = validated_data.pop('player_data', None)
+        monster_data = validated_data.pop('monster_data', None)
 
         instance.name = validated_data.get('name', instance.name)
         instance.description = validated_data.get('description', instance.description)
         instance.save()
 
-        # Update and create player data
-        player_data_ids = []
-        for player_item in player_data:
-            player_id = player_item.get('id')
-            if player_id:
-                # Update existing participant
-                player_instance = PlayerEncounterData.objects.get(id=player_id, encounter=instance)
-                player_instance.name = player_item.get('name', player_instance.name)
-                player_instance.initiative = player_item.get('initiative', player_instance.initiative)
-                player_instance.current_hp = player_item.get('current_hp', player_instance.current_hp)
-                player_instance.ac = player_item.get('ac', player_instance.ac)
-                player_instance.notes = player_item.get('notes', player_instance.notes)
-                player_instance.save()
-                player_data_ids.append(player_id)
-            else:
-                # Create new participant
-                player_item.pop('id', None)
-                new_player = PlayerEncounterData.objects.create(encounter=instance, **player_item)
-                player_data_ids.append(new_player.id)
-
-        # Delete removed player data
-        PlayerEncounterData.objects.filter(encounter=instance).exclude(id__in=player_data_ids).delete()
-
-        # Update and create monster data
-        monster_data_ids = []
-        for monster_item in monster_data:
-            monster_id = monster_item.get('id')
-            if monster_id:
-                # Update existing participant
-                monster_instance = MonsterEncounterData.objects.get(id=monster_id, encounter=instance)
-                monster_instance.name = monster_item.get('name', monster_instance.name)
-                monster_instance.initiative = monster_item.get('initiative', monster_instance.initiative)
-                monster_instance.current_hp = monster_item.get('current_hp', monster_instance.current_hp)
-                monster_instance.ac = monster_item.get('ac', monster_instance.ac)
-                monster_instance.notes = monster_item.get('notes', monster_instance.notes)
-                monster_instance.save()
-                monster_data_ids.append(monster_id)
-            else:
-                # Create new participant
-                monster_item.pop('id', None)
-                new_monster = MonsterEncounterData.objects.create(encounter=instance, **monster_item)
-                monster_data_ids.append(new_monster.id)
-
-        # Delete removed monster data
-        MonsterEncounterData.objects.filter(encounter=instance).exclude(id__in=monster_data_ids).delete()
-
-        return instance
\ No newline at end of file
+        changed, removed = [], []
+        for kind, model, items, label in (
+            ('player', PlayerEncounterData, player_data, 'player_data'),
+            ('monster', MonsterEncounterData, monster_data, 'monster_data'),
+        ):
+            # Participant lists that were left out of the request are left alone
+            if items is None:
+                continue
+            saved, deleted = self._sync_participants(instance, model, items, label)
+            changed += [participant_row(kind, participant) for participant in saved]
+            removed += [{'kind': kind, 'id': participant_id} for participant_id in sorted(deleted)]
+        broadcast_participants(instance.id, changed, removed)
+
+        return instance
+
+    @staticmethod
+    def _sync_participants(encounter, model, items, label):
+        """
+        Make the encounter's participants match ``items``: rows with an id are
+        updated, rows without one are created and stored rows missing from
+        ``items`` are deleted. Existing rows are loaded in one query and only
+        the ones whose values changed are written back.
+
+        Returns the changed and created participants and the deleted ids.
+        """
+        existing = {row.id: row for row in model.objects.filter(encounter=encounter)}
+
+        unknown = sorted({item['id'] for item in items if item.get('id')} - set(existing))
+        if unknown:
+            raise serializers.ValidationError({label: [f"Unknown ids for this encounter: {unknown}"]})
+
+        kept, changed, created = set(), [], []
+        for item in items:
+            participant_id = item.pop('id', None)
+            if not participant_id:
+                created.append(model(encounter=encounter, **item))
+                continue
+
+            participant = existing[participant_id]
+            kept.add(participant_id)
+            updates = {
+                field: item[field] for field in PARTICIPANT_UPDATE_FIELDS
+                if field in item and getattr(participant, field) != item[field]
+            }
+            if updates:
+                for field, value in updates.items():
+                    setattr(participant, field, value)
+                changed.append(participant)
+
+        removed = set(existing) - kept
+        if removed:
+            model.objects.filter(id__in=removed).delete()
+        if changed:
+            model.objects.bulk_update(changed, PARTICIPANT_UPDATE_FIELDS)
+        if created:
+            model.objects.bulk_create(created)
+        return changed + created, removed
+
+
+class MonsterGroupSerializer(serializers.Serializer):
+    monster_id = serializers.IntegerField(required=False)
+    cr = serializers.CharField(required=False)
+    xp = serializers.IntegerField(required=False, min_value=0)
+    count = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, attrs):
+        given = [field for field in ('monster_id', 'cr', 'xp') if field in attrs]
+        if len(given) != 1:
+            raise serializers.ValidationError("Give exactly one of monster_id, cr or xp.")
+        return attrs
+
+
+class EncounterDifficultySerializer(serializers.Serializer):
+    party_levels = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=20), required=False, max_length=50
+    )
+    player_character_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=50
+    )
+    encounter_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=1000
+    )
+    monster_sets = serializers.ListField(
+        child=MonsterGroupSerializer(many=True), required=False, max_length=10000
+    )
+
+    def validate_encounter_ids(self, value):
+        # Each id gets one entry in the response, so repeating one has no meaning
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Each encounter can only be listed once.")
+        return value
+
+    def validate(self, attrs):
+        if not attrs.get('party_levels') and not attrs.get('player_character_ids'):
+            raise serializers.ValidationError("Give the party as party_levels or player_character_ids.")
+        if not attrs.get('encounter_ids') and not attrs.get('monster_sets'):
+            raise serializers.ValidationError("Give encounter_ids and/or monster_sets to score.")
+        return attrs
+
+
+class EncounterGenerateSerializer(serializers.Serializer):
+    party_levels = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=20), required=False, max_length=50
+    )
+    player_character_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=50
+    )
+    difficulty = serializers.ChoiceField(choices=['easy', 'medium', 'hard', 'deadly'], default='medium')
+    monster_types = serializers.ListField(child=serializers.CharField(), required=False)
+    cr_min = serializers.FloatField(required=False, min_value=0)
+    cr_max = serializers.FloatField(required=False, min_value=0)
+    max_monsters = serializers.IntegerField(min_value=1, max_value=20, default=8)
+    max_groups = serializers.IntegerField(min_value=1, max_value=5, default=3)
+    options = serializers.IntegerField(min_value=1, max_value=20, default=5)
+    time_budget_ms = serializers.IntegerField(min_value=10, max_value=2000, default=250)
+    seed = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    save = serializers.BooleanField(default=False)
+    name = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not attrs.get('party_levels') and not attrs.get('player_character_ids'):
+            raise serializers.ValidationError("Give the party as party_levels or player_character_ids.")
+        return attrs
+
+
+class EncounterSimulationSerializer(serializers.Serializer):
+    trials = serializers.IntegerField(min_value=1, max_value=200000, default=2000)
+    time_budget_ms = serializers.IntegerField(min_value=10, max_value=10000, default=2000)
+    max_rounds = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    seed = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    pc_attack_bonus = serializers.IntegerField(required=False, min_value=-5, max_value=30)
+    pc_damage = serializers.FloatField(required=False, min_value=0)
+    monster_attack_bonus = serializers.IntegerField(required=False, min_value=-5, max_value=30)
+    monster_damage = serializers.FloatField(required=False, min_value=0)
+
+
+class CombatDeltaSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['player', 'monster'])
+    id = serializers.IntegerField()
+    current_hp = serializers.IntegerField(required=False, allow_null=True)
+    hp_change = serializers.IntegerField(required=False)
+    initiative = serializers.IntegerField(required=False, allow_null=True)
+    ac = serializers.IntegerField(required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+    def validate(self, attrs):
+        if 'current_hp' in attrs and 'hp_change' in attrs:
+            raise serializers.ValidationError("Give either current_hp or hp_change, not both.")
+        if set(attrs) <= {'kind', 'id'}:
+            raise serializers.ValidationError("Give at least one field to change.")
+        return attrs
+
+
+class EncounterSummarySerializer(serializers.ModelSerializer):
+    player_count = serializers.IntegerField(read_only=True)
+    monster_count = serializers.IntegerField(read_only=True)
+    monster_xp = serializers.IntegerField(read_only=True)
+    player_names = serializers.ListField(child=serializers.CharField(allow_null=True), read_only=True)
+    monster_names = serializers.ListField(child=serializers.CharField(allow_null=True), read_only=True)
+
+    class Meta:
+        model = Encounter
+        fields = [
+            "id", "name", "description", "player_count", "monster_count", "monster_xp",
+            "player_names", "monster_names",
+        ]
@@ -0,0 +1,207 @@
+"""
+Monte Carlo combat simulation.
+
+This module only depends on NumPy so that trial shards can run in worker
+processes without setting up Django.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import numpy as np
+
+PARTY, MONSTERS = 0, 1
+
+# Monster attack bonus and damage per round by challenge rating (midpoints of
+# the Dungeon Master's Guide "Monster Statistics by Challenge Rating" table)
+CR_ATTACK_BONUS = {
+    "0": 3, "1/8": 3, "1/4": 3, "1/2": 3, "1": 3, "2": 3, "3": 4, "4": 5, "5": 6, "6": 6, "7": 6,
+    "8": 7, "9": 7, "10": 7, "11": 8, "12": 8, "13": 8, "14": 8, "15": 8, "16": 9, "17": 10,
+    "18": 10, "19": 10, "20": 10, "21": 11, "22": 11, "23": 11, "24": 12, "25": 12, "26": 12,
+    "27": 13, "28": 13, "29": 13, "30": 14,
+}
+CR_DAMAGE = {
+    "0": 1, "1/8": 3, "1/4": 5, "1/2": 7, "1": 12, "2": 18, "3": 24, "4": 30,
+    **{str(cr): 36 + 6 * (cr - 5) for cr in range(5, 20)},
+    "20": 132, **{str(cr): 150 + 18 * (cr - 21) for cr in range(21, 31)},
+}
+DEFAULT_MONSTER_DAMAGE = 5
+DEFAULT_MONSTER_ATTACK_BONUS = 3
+
+DIE_SIDES = 6
+DIE_AVERAGE = (DIE_SIDES + 1) / 2
+
+_pool = None
+
+
+def proficiency_bonus(level):
+    return 2 + (max(level, 1) - 1) // 4
+
+
+def pc_attack_bonus(level):
+    """Proficiency plus a +3 primary ability modifier, rising to +5 by level 8."""
+    return proficiency_bonus(level) + 3 + min(max(level, 1) // 4, 2)
+
+
+def pc_damage(level):
+    """Rough damage per round of an optimised character of the given level."""
+    return 5 + 2 * max(level, 1)
+
+
+def damage_dice(average):
+    """Split an average damage into a number of d6 and a flat bonus with the same mean."""
+    dice = np.maximum(1, np.round(np.asarray(average, dtype=np.float64) * 0.7 / DIE_AVERAGE)).astype(np.int64)
+    flat = np.round(np.asarray(average) - dice * DIE_AVERAGE).astype(np.int64)
+    return dice, flat
+
+
+def _run_batch(combatants, trials, max_rounds, rng):
+    side = combatants['side']
+    hp = np.tile(combatants['hp'].astype(np.int64), (trials, 1))
+    ac = combatants['ac']
+    bonus = combatants['attack_bonus']
+    dice = combatants['dice']
+    flat = combatants['flat']
+    order = combatants['order']
+    n = len(side)
+    rows = np.arange(trials)
+    max_dice = int(dice.max()) * 2
+
+    rounds = np.zeros(trials, dtype=np.int64)
+    finished = np.zeros(trials, dtype=bool)
+
+    for round_number in range(1, max_rounds + 1):
+        for attacker in order:
+            alive = hp > 0
+            acting = alive[:, attacker] & ~finished
+            enemies = alive & (side != side[attacker])
+            has_target = enemies.any(axis=1)
+            acting &= has_target
+            if not acting.any():
+                continue
+
+            # Pick a random living enemy per trial
+            weights = rng.random((trials, n)) * enemies
+            target = weights.argmax(axis=1)
+
+            roll = rng.integers(1, 21, trials)
+            critical = roll == 20
+            hit = ((roll + bonus[attacker] >= ac[target]) & (roll != 1)) | critical
+            # Critical hits roll the damage dice twice
+            dice_rolled = np.where(critical, dice[attacker] * 2, dice[attacker])
+            faces = rng.integers(1, DIE_SIDES + 1, (trials, max_dice))
+            damage = (faces * (np.arange(max_dice) < dice_rolled[:, None])).sum(axis=1) + flat[attacker]
+            damage = np.maximum(damage, 1) * (hit & acting)
+            hp[rows, target] -= damage
+
+        alive = hp > 0
+        party_up = (alive & (side == PARTY)).any(axis=1)
+        monsters_up = (alive & (side == MONSTERS)).any(axis=1)
+        ended = ~finished & ~(party_up & monsters_up)
+        rounds[ended] = round_number
+        finished |= ended
+        if finished.all():
+            break
+
+    rounds[~finished] = max_rounds
+    alive = hp > 0
+    party_up = (alive & (side == PARTY)).any(axis=1)
+    monsters_up = (alive & (side == MONSTERS)).any(axis=1)
+    return {
+        'trials': trials,
+        'wins': int((party_up & ~monsters_up).sum()),
+        'losses': int((~party_up).sum()),
+        'rounds': int(rounds.sum()),
+        'pc_downs': (~alive[:, side == PARTY]).sum(axis=0),
+    }
+
+
+def _run_shard(combatants, trials, max_rounds, batch_size, deadline, seed):
+    rng = np.random.default_rng(seed)
+    totals = None
+    done = 0
+    while done < trials and (totals is None or time.time() < deadline):
+        batch = _run_batch(combatants, min(batch_size, trials - done), max_rounds, rng)
+        done += batch['trials']
+        if totals is None:
+            totals = batch
+        else:
+            for key in totals:
+                totals[key] = totals[key] + batch[key]
+    return totals
+
+
+def _get_pool(workers):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+    return _pool
+
+
+def _discard_pool(pool):
+    """Drop a pool whose worker died, so the next call starts a fresh one."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_sharded(combatants, trials, max_rounds, batch_size, deadline, shard_seeds):
+    workers = len(shard_seeds)
+    shard_sizes = [len(shard) for shard in np.array_split(np.arange(trials), workers)]
+    pool = _get_pool(workers)
+    try:
+        futures = [
+            pool.submit(_run_shard, combatants, size, max_rounds, batch_size, deadline, child)
+            for size, child in zip(shard_sizes, shard_seeds)
+        ]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def simulate(combatants, trials=2000, max_rounds=20, time_budget=2.0, batch_size=5000,
+             parallel_threshold=20000, workers=2, seed=None):
+    """
+    Run ``trials`` simulated fights and summarise them.
+
+    ``combatants`` holds parallel arrays (side, hp, ac, attack_bonus, dice,
+    flat) plus ``order``, the turn order as indexes into them. Trials run in
+    vectorized batches until the trial count or ``time_budget`` seconds is
+    reached; above ``parallel_threshold`` trials they are sharded across a
+    process pool of ``workers`` processes.
+    """
+    started = time.time()
+    deadline = started + time_budget
+    seeds = np.random.SeedSequence(seed)
+
+    if trials >= parallel_threshold and workers > 1:
+        shard_seeds = seeds.spawn(workers)
+        try:
+            shards = _run_sharded(combatants, trials, max_rounds, batch_size, deadline, shard_seeds)
+        except BrokenProcessPool:
+            # A worker died (killed for memory, say); retry once on a fresh pool with the same
+            # seeds, so seeded results do not change, then give up on processes for this call
+            try:
+                shards = _run_sharded(combatants, trials, max_rounds, batch_size, deadline, shard_seeds)
+            except BrokenProcessPool:
+                shards = [_run_shard(combatants, trials, max_rounds, batch_size, deadline, seeds)]
+    else:
+        shards = [_run_shard(combatants, trials, max_rounds, batch_size, deadline, seeds)]
+
+    total = sum(shard['trials'] for shard in shards)
+    pc_downs = sum(shard['pc_downs'] for shard in shards)
+    wins = sum(shard['wins'] for shard in shards)
+    losses = sum(shard['losses'] for shard in shards)
+    return {
+        'trials': total,
+        'win_probability': wins / total,
+        'loss_probability': losses / total,
+        'unfinished_probability': (total - wins - losses) / total,
+        'expected_rounds': sum(shard['rounds'] for shard in shards) / total,
+        'expected_pc_deaths': float(pc_downs.sum() / total),
+        'pc_death_probability': (pc_downs / total).tolist(),
+        'seconds': time.time() - started,
+    }
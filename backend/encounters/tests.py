@@ -0,0 +1,502 @@
+import io
+import json
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from compendium.models import Monster
+from player_characters.models import PlayerCharacter
+from sign_in.websocket import JWTAuthMiddleware
+from . import simulation
+from .consumers import NOT_FOUND, UNAUTHORIZED
+from .generator import EncounterGenerator
+from .models import Encounter, MonsterEncounterData, PlayerEncounterData
+from .routing import websocket_urlpatterns
+from .views import EncounterViewSet
+
+
+class CombatTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.client.force_authenticate(self.user)
+        self.encounter = Encounter.objects.create(user=self.user, name='Ambush')
+        monster = Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+        self.goblin = MonsterEncounterData.objects.create(
+            encounter=self.encounter, monster=monster, name='Goblin', current_hp=30, ac=15,
+        )
+        self.url = f'/api/encounters/{self.encounter.id}/combat/'
+
+    def patch(self, changes):
+        return self.client.patch(self.url, changes, format='json')
+
+    def hp(self):
+        self.goblin.refresh_from_db()
+        return self.goblin.current_hp
+
+    def test_repeated_deltas_to_one_participant_add_up(self):
+        response = self.patch([
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': -7},
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': -7},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.hp(), 16)
+        self.assertEqual(response.data[0]['current_hp'], 16)
+
+    def test_changes_apply_in_the_order_sent(self):
+        self.patch([
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': -5},
+            {'kind': 'monster', 'id': self.goblin.id, 'current_hp': 20},
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': -3},
+        ])
+        self.assertEqual(self.hp(), 17)
+
+        self.patch([
+            {'kind': 'monster', 'id': self.goblin.id, 'current_hp': 10},
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': 4, 'notes': 'healed'},
+        ])
+        self.assertEqual(self.hp(), 14)
+        self.assertEqual(self.goblin.notes, 'healed')
+
+    def test_unknown_participant_rolls_back(self):
+        response = self.patch([
+            {'kind': 'monster', 'id': self.goblin.id, 'hp_change': -5},
+            {'kind': 'monster', 'id': self.goblin.id + 1000, 'hp_change': -5},
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.hp(), 30)
+
+
+class EncounterOwnershipTests(APITestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', password='owner-password')
+        self.encounter = Encounter.objects.create(user=owner, name='Private')
+        self.client.force_authenticate(User.objects.create_user('intruder', password='intruder-password'))
+        self.url = f'/api/encounters/{self.encounter.id}/'
+
+    def test_other_users_encounters_are_not_found(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.patch(self.url, {'name': 'Mine now'}, format='json').status_code, 404)
+        self.assertEqual(self.client.delete(self.url).status_code, 404)
+        self.encounter.refresh_from_db()
+        self.assertEqual(self.encounter.name, 'Private')
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class EncounterSocketTests(TransactionTestCase):
+    # The consumer reads the database from another thread, so the rows have to be committed
+    application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.encounter = Encounter.objects.create(user=self.user, name='Ambush')
+        monster = Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+        self.goblin = MonsterEncounterData.objects.create(
+            encounter=self.encounter, monster=monster, name='Goblin', current_hp=7, ac=15,
+        )
+
+    def communicator(self, user=None, encounter=None):
+        path = f'/ws/encounters/{(encounter or self.encounter).id}/'
+        if user is not None:
+            path += f'?token={AccessToken.for_user(user)}'
+        return WebsocketCommunicator(self.application, path)
+
+    async def assertRejected(self, communicator, code):
+        connected, close_code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(close_code, code)
+
+    async def test_connections_without_a_valid_token_are_rejected(self):
+        await self.assertRejected(self.communicator(), UNAUTHORIZED)
+        invalid = WebsocketCommunicator(self.application, f'/ws/encounters/{self.encounter.id}/?token=invalid')
+        await self.assertRejected(invalid, UNAUTHORIZED)
+
+    async def test_other_users_encounters_are_rejected(self):
+        intruder = await sync_to_async(User.objects.create_user)('intruder', password='intruder-password')
+        await self.assertRejected(self.communicator(intruder), NOT_FOUND)
+
+    async def test_combat_changes_are_broadcast_to_the_encounter(self):
+        communicator = self.communicator(self.user)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = await sync_to_async(client.patch)(
+            f'/api/encounters/{self.encounter.id}/combat/',
+            [{'kind': 'monster', 'id': self.goblin.id, 'hp_change': -3}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        message = await communicator.receive_json_from(timeout=5)
+        self.assertEqual(message['encounter'], self.encounter.id)
+        self.assertEqual(message['removed'], [])
+        self.assertEqual(
+            [(row['kind'], row['id'], row['current_hp']) for row in message['changed']],
+            [('monster', self.goblin.id, 4)],
+        )
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+
+class SyntheticDataTests(TestCase):
+    def setUp(self):
+        Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+
+    def generate(self, users):
+        call_command(
+            'generate_synthetic_data', users=users, characters_per_user=1, encounters_per_user=1,
+            prefix='synth', stdout=io.StringIO(),
+        )
+
+    def test_new_users_never_reuse_a_username(self):
+        User.objects.create_user('synthesis')
+        self.generate(3)
+        Encounter.objects.filter(user__username='synth0').delete()
+        User.objects.get(username='synth0').delete()
+        self.generate(2)
+        self.assertEqual(
+            sorted(User.objects.filter(username__startswith='synth').values_list('username', flat=True)),
+            ['synth1', 'synth2', 'synth3', 'synth4', 'synthesis'],
+        )
+
+
+class DifficultyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.client.force_authenticate(self.user)
+        self.encounter = Encounter.objects.create(user=self.user, name='Ambush')
+        monster = Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+        MonsterEncounterData.objects.create(encounter=self.encounter, monster=monster, name='Goblin', current_hp=7)
+
+    def score(self, encounter_ids):
+        return self.client.post(
+            '/api/encounters/difficulty/', {'party_levels': [1, 1], 'encounter_ids': encounter_ids}, format='json',
+        )
+
+    def test_stored_encounters_are_scored(self):
+        response = self.score([self.encounter.id])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['base_xp'], 50)
+
+    def test_repeated_encounter_ids_are_rejected(self):
+        response = self.score([self.encounter.id, self.encounter.id])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('encounter_ids', response.data)
+
+
+class EncounterGeneratorTests(TestCase):
+    party = [3, 3]
+
+    def setUp(self):
+        for cr in ('1/8', '1/4', '1/2', '1', '2', '3'):
+            for kind in ('goblin', 'wolf'):
+                Monster.objects.create(name=f'{kind} {cr}', url='', cr=cr, type='beast', ac=12, hp=10)
+        self.monsters = list(Monster.objects.values('id', 'name', 'cr', 'xp', 'type', 'ac', 'hp'))
+
+    def test_bands_follow_the_party_thresholds(self):
+        # Two level 3 characters: easy 150, medium 300, hard 450, deadly 600
+        bands = {difficulty: EncounterGenerator(self.party, difficulty).band
+                 for difficulty in ('trivial', 'easy', 'medium', 'hard', 'deadly')}
+        self.assertEqual(bands, {
+            'trivial': (0.0, 150.0), 'easy': (150.0, 300.0), 'medium': (300.0, 450.0),
+            'hard': (450.0, 600.0), 'deadly': (600.0, 900.0),
+        })
+
+    def test_options_land_in_the_band(self):
+        for difficulty in ('trivial', 'easy', 'medium', 'hard', 'deadly'):
+            generator = EncounterGenerator(self.party, difficulty, seed=1)
+            options = generator.generate(self.monsters)
+            low, high = generator.band
+            self.assertTrue(options, difficulty)
+            for option in options:
+                self.assertEqual(option['difficulty'], difficulty)
+                self.assertTrue(low <= option['adjusted_xp'] < high, (difficulty, option['adjusted_xp']))
+
+
+class EncounterGenerateViewTests(APITestCase):
+    url = '/api/encounters/generate/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.client.force_authenticate(self.user)
+        for cr in ('1/4', '1/2', '1', '2'):
+            Monster.objects.create(name=f'goblin {cr}', url='', cr=cr, type='humanoid', ac=12, hp=10)
+
+    def generate(self, **data):
+        return self.client.post(self.url, {'party_levels': [3, 3], 'difficulty': 'medium', **data}, format='json')
+
+    def test_a_seed_repeats_the_options(self):
+        first, second = self.generate(seed=7), self.generate(seed=7)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.data['options'])
+        self.assertEqual(first.data['options'], second.data['options'])
+
+    def test_negative_seeds_are_rejected(self):
+        response = self.generate(seed=-1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('seed', response.data)
+
+    def test_save_stores_the_best_option(self):
+        response = self.generate(seed=3, save=True, name='Generated')
+        self.assertEqual(response.status_code, 200)
+        encounter = Encounter.objects.get(user=self.user)
+        self.assertEqual(response.data['encounter']['id'], encounter.id)
+        self.assertEqual(encounter.name, 'Generated')
+        best = response.data['options'][0]
+        self.assertEqual(encounter.monster_data.count(), sum(monster['count'] for monster in best['monsters']))
+        self.assertEqual(
+            sorted(encounter.monster_data.values_list('monster_id', flat=True)),
+            sorted(monster['id'] for monster in best['monsters'] for _ in range(monster['count'])),
+        )
+
+
+class BrokenPool:
+    """Stands in for a process pool whose workers died."""
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("A worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class InlinePool(BrokenPool):
+    """Stands in for a healthy process pool by running each shard right away."""
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+class SimulationTests(SimpleTestCase):
+    combatants = {
+        'side': np.array([simulation.PARTY, simulation.MONSTERS]),
+        'hp': np.array([20, 15]),
+        'ac': np.array([15, 13]),
+        'attack_bonus': np.array([5, 4]),
+        'dice': np.array([2, 1]),
+        'flat': np.array([2, 1]),
+        'order': np.array([0, 1]),
+    }
+
+    def simulate(self, **kwargs):
+        result = simulation.simulate(self.combatants, trials=400, time_budget=60, seed=5, **kwargs)
+        del result['seconds']
+        return result
+
+    def sharded(self):
+        return self.simulate(parallel_threshold=1, workers=2)
+
+    def test_a_seed_repeats_the_results(self):
+        self.assertEqual(self.simulate(), self.simulate())
+
+    def test_a_broken_pool_is_replaced(self):
+        with mock.patch.object(simulation, '_pool', BrokenPool()), \
+                mock.patch.object(simulation, 'ProcessPoolExecutor', return_value=InlinePool()) as new_pool:
+            result = self.sharded()
+            self.assertEqual(new_pool.call_count, 1)
+            self.assertIsInstance(simulation._pool, InlinePool)
+        with mock.patch.object(simulation, '_pool', InlinePool()):
+            # The retry used the same shard seeds, so the results are what a healthy pool gives
+            self.assertEqual(result, self.sharded())
+
+    def test_runs_in_process_when_pools_keep_breaking(self):
+        with mock.patch.object(simulation, '_pool', None), \
+                mock.patch.object(simulation, 'ProcessPoolExecutor', return_value=BrokenPool()):
+            result = self.sharded()
+            self.assertIsNone(simulation._pool)
+        self.assertEqual(result, self.simulate())
+
+
+class EncounterSimulateViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.client.force_authenticate(self.user)
+        self.encounter = Encounter.objects.create(user=self.user, name='Ambush')
+        monster = Monster.objects.create(name='goblin', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+        MonsterEncounterData.objects.create(encounter=self.encounter, monster=monster, name='Goblin', current_hp=7)
+        PlayerEncounterData.objects.create(encounter=self.encounter, name='Hero', current_hp=20, ac=16)
+        self.url = f'/api/encounters/{self.encounter.id}/simulate/'
+
+    def simulate(self, **data):
+        return self.client.post(self.url, {'trials': 500, 'time_budget_ms': 10000, **data}, format='json')
+
+    def test_a_seed_repeats_the_results(self):
+        first, second = self.simulate(seed=11), self.simulate(seed=11)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['trials'], 500)
+        first.data.pop('seconds'), second.data.pop('seconds')
+        self.assertEqual(first.data, second.data)
+
+    def test_negative_seeds_are_rejected(self):
+        response = self.simulate(seed=-1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('seed', response.data)
+
+
+class EncounterWriteTests(APITestCase):
+    url = '/api/encounters/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.client.force_authenticate(self.user)
+        self.monsters = [
+            Monster.objects.create(name=f'goblin {i}', url='', cr='1/4', type='humanoid', ac=15, hp=7)
+            for i in range(50)
+        ]
+        self.characters = [
+            PlayerCharacter.objects.create(user=self.user, character_name=f'Hero {i}', hp=20, ac=15)
+            for i in range(4)
+        ]
+
+    def body(self, monsters):
+        return {
+            'name': 'Ambush',
+            'player_data': [{'player_character_id': character.id, 'current_hp': 20} for character in self.characters],
+            'monster_data': [{'monster_id': monster.id, 'current_hp': 7} for monster in self.monsters[:monsters]],
+        }
+
+    def queries(self, method, url, body):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, body, format='json')
+        self.assertIn(response.status_code, (200, 201), response.data)
+        return len(queries), response
+
+    def test_saving_costs_the_same_queries_for_any_number_of_participants(self):
+        create_one, _ = self.queries('post', self.url, self.body(1))
+        create_many, response = self.queries('post', self.url, self.body(50))
+        self.assertEqual(create_many, create_one)
+        self.assertLessEqual(create_many, 15)
+        self.assertEqual(len(response.data['monster_data']), 50)
+        self.assertEqual(response.data['monster_data'][0]['monster']['name'], 'goblin 0')
+
+        body = dict(response.data, monster_data=[
+            dict(row, current_hp=row['current_hp'] - 1) for row in response.data['monster_data']
+        ])
+        update_many, response = self.queries('put', f"{self.url}{response.data['id']}/", body)
+        self.assertLessEqual(update_many, 20)
+        self.assertEqual({row['current_hp'] for row in response.data['monster_data']}, {6})
+
+    def test_omitted_participant_lists_are_kept(self):
+        encounter_id = self.client.post(self.url, self.body(3), format='json').data['id']
+        response = self.client.patch(f'{self.url}{encounter_id}/', {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['monster_data']), 3)
+        self.assertEqual(len(response.data['player_data']), 4)
+
+        # An empty list, unlike a missing one, removes every participant of that kind
+        response = self.client.patch(f'{self.url}{encounter_id}/', {'monster_data': []}, format='json')
+        self.assertEqual(response.data['monster_data'], [])
+        self.assertEqual(len(response.data['player_data']), 4)
+
+    def test_unknown_participant_ids_roll_the_whole_update_back(self):
+        created = self.client.post(self.url, self.body(2), format='json').data
+        body = dict(created, name='Renamed', monster_data=[
+            dict(created['monster_data'][0], current_hp=1),
+            dict(created['monster_data'][1], id=created['monster_data'][1]['id'] + 1000),
+        ])
+        response = self.client.put(f"{self.url}{created['id']}/", body, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('monster_data', response.data)
+
+        encounter = Encounter.objects.get(id=created['id'])
+        self.assertEqual(encounter.name, 'Ambush')
+        self.assertEqual(sorted(encounter.monster_data.values_list('current_hp', flat=True)), [7, 7])
+
+
+class ParticipantValidationTests(APITestCase):
+    url = '/api/encounters/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.other = User.objects.create_user('rival', password='rival-password')
+        self.client.force_authenticate(self.user)
+        self.monsters = [
+            Monster.objects.create(name=f'wolf {i}', url='', cr='1/4', type='beast', ac=13, hp=11)
+            for i in range(50)
+        ]
+        self.characters = [
+            PlayerCharacter.objects.create(user=self.user, character_name=f'Hero {i}', hp=20, ac=15)
+            for i in range(50)
+        ]
+
+    def body(self, participants):
+        return {
+            'name': 'Pack',
+            'player_data': [
+                {'player_character_id': character.id, 'current_hp': 20} for character in self.characters[:participants]
+            ],
+            'monster_data': [
+                {'monster_id': monster.id, 'current_hp': 11} for monster in self.monsters[:participants]
+            ],
+        }
+
+    def test_another_users_character_is_rejected(self):
+        theirs = PlayerCharacter.objects.create(user=self.other, character_name='Rival', hp=20, ac=15)
+        body = self.body(1)
+        body['player_data'].append({'player_character_id': theirs.id, 'current_hp': 20})
+        response = self.client.post(self.url, body, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('player_data', response.data)
+        self.assertFalse(Encounter.objects.exists())
+
+    def test_participant_ids_are_resolved_in_one_query_per_field(self):
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(self.client.post(self.url, self.body(1), format='json').status_code, 201)
+        with self.assertNumQueries(len(one)):
+            response = self.client.post(self.url, self.body(50), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['player_data']), 50)
+        self.assertEqual(len(response.data['monster_data']), 50)
+
+
+class AsyncEncounterReadTests(APITestCase):
+    """The async detail view reads owned encounters itself; its JSON must match the viewset's."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.other = User.objects.create_user('rival', password='rival-password')
+        monster = Monster.objects.create(name='ogre', url='', cr='2', type='giant', ac=11, hp=59)
+        character = PlayerCharacter.objects.create(user=self.user, character_name='Hero', hp=20, ac=15)
+        self.encounter = Encounter.objects.create(user=self.user, name='Bridge')
+        PlayerEncounterData.objects.create(encounter=self.encounter, player_character=character, current_hp=12)
+        MonsterEncounterData.objects.create(encounter=self.encounter, monster=monster, current_hp=40)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def sync_response(self, user, pk):
+        request = APIRequestFactory().get(f'/api/encounters/{pk}/')
+        force_authenticate(request, user)
+        return EncounterViewSet.as_view({'get': 'retrieve'})(request, pk=pk).render()
+
+    def test_owned_encounter_matches_the_viewset(self):
+        expected = self.sync_response(self.user, self.encounter.pk)
+        with mock.patch.object(EncounterViewSet, 'retrieve') as retrieve:
+            response = self.client.get(f'/api/encounters/{self.encounter.pk}/')
+        retrieve.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), json.loads(expected.content))
+        self.assertEqual(response['Content-Type'], expected['Content-Type'])
+
+    def test_other_users_encounters_fall_through_to_the_viewset(self):
+        theirs = Encounter.objects.create(user=self.other, name='Theirs')
+        self.assertEqual(self.sync_response(self.user, theirs.pk).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/encounters/{theirs.pk}/').status_code, 404)
+
+    def test_missing_token_falls_through_to_the_viewset(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(f'/api/encounters/{self.encounter.pk}/').status_code, 401)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import EncounterViewSet, PlayerEncounterDataViewSet, MonsterEncounterDataViewSet
@@ -9,4 +10,12 @@ router.register(r'encounters/monster_data', MonsterEncounterDataViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import encounter_detail
+
+    # Listed before the router's routes so it matches first; those keep their names for reverse()
+    urlpatterns = [
+        path('encounters/<int:pk>/', encounter_detail),
+    ] + urlpatterns
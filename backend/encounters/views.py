@@ -1,10 +1,58 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from compendium.models import Monster
+from player_characters.models import PlayerCharacter
+from .difficulty import DIFFICULTIES, cr_to_xp, score_encounters
+from .generator import EncounterGenerator
+from .simulation import (
+    CR_ATTACK_BONUS, CR_DAMAGE, DEFAULT_MONSTER_ATTACK_BONUS, DEFAULT_MONSTER_DAMAGE, MONSTERS, PARTY,
+    damage_dice, pc_attack_bonus, pc_damage, simulate,
+)
+from .broadcast import PARTICIPANT_FIELDS, broadcast_participants, participant_row
 from .models import Encounter, PlayerEncounterData, MonsterEncounterData
-from .serializers import EncounterSerializer, PlayerEncounterDataSerializer, MonsterEncounterDataSerializer
+from .pagination import EncounterSummaryPagination
+from .serializers import (
+    CombatDeltaSerializer,
+    EncounterDifficultySerializer,
+    EncounterGenerateSerializer,
+    EncounterSimulationSerializer,
+    EncounterSummarySerializer,
+    EncounterSerializer,
+    PlayerEncounterDataSerializer,
+    MonsterEncounterDataSerializer,
+)
+
+
+def _missing(requested, found, label):
+    missing = sorted(set(requested) - set(found))
+    if missing:
+        raise ValidationError({label: [f"Unknown ids: {missing}"]})
+
+
+def _first_set(*values):
+    return next(value for value in values if value is not None)
+
+
+def _resolve_party(user, data):
+    """Return the party's levels and the user's characters named in ``player_character_ids``."""
+    levels = list(data.get('party_levels', []))
+    character_ids = data.get('player_character_ids', [])
+    characters = []
+    if character_ids:
+        by_id = PlayerCharacter.objects.filter(user=user, id__in=character_ids).in_bulk()
+        _missing(character_ids, by_id, 'player_character_ids')
+        characters = [by_id[character_id] for character_id in character_ids]
+        levels += [character.character_level for character in characters]
+    return levels, characters
+
 
 class EncounterViewSet(viewsets.ModelViewSet):
     queryset = Encounter.objects.prefetch_related(
@@ -14,17 +62,319 @@ class EncounterViewSet(viewsets.ModelViewSet):
     serializer_class = EncounterSerializer
     permission_classes = [IsAuthenticated]
 
-    @action(detail=False, methods=['get'])
+    def get_queryset(self):
+        # Every action, including retrieve, update and destroy, only sees the user's own encounters
+        return self.queryset.filter(user=self.request.user)
+
+    @action(detail=False, methods=['get'], pagination_class=EncounterSummaryPagination)
     def my_encounters(self, request):
-        user_encounters = self.queryset.filter(user=request.user)
-        serializer = self.get_serializer(user_encounters, many=True)
-        return Response(serializer.data)
+        """
+        Paginated summaries of the user's encounters; the nested participants
+        are only served by the detail endpoint.
+        """
+        user_encounters = Encounter.objects.filter(user=request.user).with_summary().order_by('id')
+        page = self.paginate_queryset(user_encounters)
+        serializer = EncounterSummarySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['patch'])
+    def combat(self, request, pk=None):
+        """
+        Apply a list of participant changes and return only the rows they touched.
+
+        Each change names a participant by ``kind`` and ``id`` and sets any of
+        current_hp, initiative, ac and notes; ``hp_change`` adjusts the stored
+        hit points in the database instead. Changes are applied in the order
+        sent: the changes to each participant are folded into one net change,
+        and participants with identical net changes share one UPDATE, so a
+        typical turn costs one or two queries.
+        """
+        serializer = CombatDeltaSerializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+
+        participant_models = {'player': PlayerEncounterData, 'monster': MonsterEncounterData}
+        net_changes = {}
+        for change in serializer.validated_data:
+            fields = net_changes.setdefault((change.pop('kind'), change.pop('id')), {})
+            hp_change = change.pop('hp_change', None)
+            fields.update(change)
+            if 'current_hp' in change:
+                # A later absolute value replaces the deltas sent before it
+                fields.pop('hp_change', None)
+            if hp_change is not None:
+                if 'current_hp' in fields:
+                    current_hp = fields['current_hp']
+                    fields['current_hp'] = None if current_hp is None else current_hp + hp_change
+                else:
+                    fields['hp_change'] = fields.get('hp_change', 0) + hp_change
+
+        groups = {}
+        for (kind, participant_id), fields in net_changes.items():
+            groups.setdefault((kind, tuple(sorted(fields.items()))), set()).add(participant_id)
+
+        touched = {kind: set() for kind in participant_models}
+        with transaction.atomic():
+            for (kind, fields), ids in groups.items():
+                fields = dict(fields)
+                if 'hp_change' in fields:
+                    fields['current_hp'] = F('current_hp') + fields.pop('hp_change')
+                updated = participant_models[kind].objects.filter(
+                    id__in=ids, encounter_id=pk, encounter__user=request.user
+                ).update(**fields)
+                if updated != len(ids):
+                    raise NotFound(f"Not all of {kind} ids {sorted(ids)} belong to this encounter.")
+                touched[kind] |= ids
+
+            rows = []
+            for kind, ids in touched.items():
+                if ids:
+                    rows += [
+                        {'kind': kind, **row} for row in participant_models[kind].objects.filter(
+                            id__in=ids
+                        ).values(*PARTICIPANT_FIELDS).order_by('id')
+                    ]
+            broadcast_participants(int(pk), rows)
+        return Response(rows)
+
+    @action(detail=False, methods=['post'])
+    def difficulty(self, request):
+        """Score stored encounters and/or hypothetical monster sets against one party."""
+        serializer = EncounterDifficultySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        levels, _ = _resolve_party(request.user, data)
+
+        # One entry per monster group: (encounter position, xp, count)
+        groups = []
+        sources = []
+
+        encounter_ids = data.get('encounter_ids', [])
+        if encounter_ids:
+            found = Encounter.objects.filter(user=request.user, id__in=encounter_ids).values_list('id', flat=True)
+            _missing(encounter_ids, found, 'encounter_ids')
+            positions = {}
+            for encounter_id in encounter_ids:
+                positions[encounter_id] = len(sources)
+                sources.append({'source': 'encounter', 'encounter_id': encounter_id})
+            monster_xp = MonsterEncounterData.objects.filter(
+                encounter_id__in=encounter_ids, monster__isnull=False
+            ).values_list('encounter_id', 'monster__xp')
+            groups += [(positions[encounter_id], xp or 0, 1) for encounter_id, xp in monster_xp]
+
+        monster_sets = data.get('monster_sets', [])
+        monster_ids = {
+            item['monster_id'] for monster_set in monster_sets for item in monster_set if 'monster_id' in item
+        }
+        monster_xp = dict(Monster.objects.filter(id__in=monster_ids).values_list('id', 'xp')) if monster_ids else {}
+        _missing(monster_ids, monster_xp, 'monster_sets')
+        for index, monster_set in enumerate(monster_sets):
+            position = len(sources)
+            sources.append({'source': 'monster_set', 'index': index})
+            for item in monster_set:
+                if 'monster_id' in item:
+                    xp = monster_xp[item['monster_id']] or 0
+                elif 'cr' in item:
+                    xp = cr_to_xp(item['cr'])
+                else:
+                    xp = item['xp']
+                groups.append((position, xp, item['count']))
+
+        encounter_index, xp, counts = zip(*groups) if groups else ((), (), ())
+        scores = score_encounters(levels, xp, counts, encounter_index, len(sources))
+
+        results = [
+            {
+                **source,
+                'monster_count': int(scores['monster_count'][i]),
+                'base_xp': int(scores['base_xp'][i]),
+                'multiplier': float(scores['multiplier'][i]),
+                'adjusted_xp': float(scores['adjusted_xp'][i]),
+                'difficulty': DIFFICULTIES[scores['difficulty'][i]],
+            }
+            for i, source in enumerate(sources)
+        ]
+        return Response({
+            'party': {
+                'levels': levels,
+                'thresholds': dict(zip(DIFFICULTIES[1:], scores['thresholds'].tolist())),
+            },
+            'results': results,
+        })
+
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """Suggest monster combinations for a party and difficulty, optionally saving the best one."""
+        serializer = EncounterGenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        levels, characters = _resolve_party(request.user, data)
+        generator = EncounterGenerator(
+            levels,
+            data['difficulty'],
+            max_monsters=data['max_monsters'],
+            max_groups=data['max_groups'],
+            options=data['options'],
+            time_budget=data['time_budget_ms'] / 1000,
+            seed=data.get('seed'),
+        )
+
+        monsters = Monster.objects.filter(xp__gt=0, xp__lt=generator.max_monster_xp)
+        if data.get('monster_types'):
+            type_query = Q()
+            for monster_type in data['monster_types']:
+                type_query |= Q(type__istartswith=monster_type)
+            monsters = monsters.filter(type_query)
+        if data.get('cr_min') is not None:
+            monsters = monsters.filter(cr_value__gte=data['cr_min'])
+        if data.get('cr_max') is not None:
+            monsters = monsters.filter(cr_value__lte=data['cr_max'])
+
+        options = generator.generate(monsters.values('id', 'name', 'cr', 'xp', 'type', 'ac', 'hp'))
+        low, high = generator.band
+        response = {
+            'party': {
+                'levels': levels,
+                'thresholds': dict(zip(DIFFICULTIES[1:], generator.thresholds.tolist())),
+            },
+            'difficulty': data['difficulty'],
+            'adjusted_xp_range': [low, high],
+            'options': options,
+        }
+
+        if data['save'] and options:
+            encounter = self._save_generated(request.user, data, characters, options[0])
+            response['encounter'] = EncounterSerializer(encounter).data
+        return Response(response)
+
+    @staticmethod
+    @transaction.atomic
+    def _save_generated(user, data, characters, option):
+        encounter = Encounter.objects.create(
+            user=user,
+            name=data.get('name') or f"Generated {data['difficulty']} encounter",
+            description=data.get('description', ''),
+        )
+        PlayerEncounterData.objects.bulk_create([
+            PlayerEncounterData(
+                encounter=encounter,
+                player_character=character,
+                name=character.character_name,
+                current_hp=character.hp,
+                ac=character.ac,
+            )
+            for character in characters
+        ])
+        MonsterEncounterData.objects.bulk_create([
+            MonsterEncounterData(
+                encounter=encounter,
+                monster_id=monster['id'],
+                name=monster['name'],
+                current_hp=monster['hp'],
+                ac=monster['ac'],
+            )
+            for monster in option['monsters']
+            for _ in range(monster['count'])
+        ])
+        return encounter
+
+    @action(detail=True, methods=['post'])
+    def simulate(self, request, pk=None):
+        """Estimate the outcome of this encounter with a Monte Carlo combat simulation."""
+        serializer = EncounterSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        encounter = self.get_queryset().filter(user=request.user, pk=pk).first()
+        if encounter is None:
+            raise NotFound()
+
+        players = list(encounter.player_data.all())
+        monsters = list(encounter.monster_data.all())
+        if not players or not monsters:
+            raise ValidationError("The encounter needs at least one player and one monster to simulate.")
+
+        side, hp, ac, bonus, damage, initiative = [], [], [], [], [], []
+        for player in players:
+            character = player.player_character
+            level = character.character_level if character else 1
+            side.append(PARTY)
+            hp.append(_first_set(player.current_hp, character and character.hp, 8 * level))
+            ac.append(_first_set(player.ac, character and character.ac, 14))
+            bonus.append(data.get('pc_attack_bonus', pc_attack_bonus(level)))
+            damage.append(data.get('pc_damage', pc_damage(level)))
+            initiative.append(player.initiative)
+        for entry in monsters:
+            monster = entry.monster
+            cr = monster.cr if monster else None
+            side.append(MONSTERS)
+            hp.append(_first_set(entry.current_hp, monster and monster.hp, 10))
+            ac.append(_first_set(entry.ac, monster and monster.ac, 12))
+            bonus.append(data.get('monster_attack_bonus', CR_ATTACK_BONUS.get(cr, DEFAULT_MONSTER_ATTACK_BONUS)))
+            damage.append(data.get('monster_damage', CR_DAMAGE.get(cr, DEFAULT_MONSTER_DAMAGE)))
+            initiative.append(entry.initiative)
+
+        dice, flat = damage_dice(damage)
+        combatants = {
+            'side': np.array(side),
+            'hp': np.array(hp),
+            'ac': np.array(ac),
+            'attack_bonus': np.array(bonus),
+            'dice': dice,
+            'flat': flat,
+            # Highest initiative first; combatants without one act as if they rolled 10
+            'order': np.argsort([-(value if value is not None else 10) for value in initiative], kind='stable'),
+        }
+        result = simulate(
+            combatants,
+            trials=data['trials'],
+            max_rounds=data['max_rounds'],
+            time_budget=data['time_budget_ms'] / 1000,
+            parallel_threshold=settings.SIMULATION_PARALLEL_THRESHOLD,
+            workers=settings.SIMULATION_WORKERS,
+            seed=data.get('seed'),
+        )
+        result['pc_death_probability'] = [
+            {'player_data_id': player.id, 'probability': probability}
+            for player, probability in zip(players, result['pc_death_probability'])
+        ]
+        return Response({'encounter_id': encounter.id, **result})
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        self._reload(serializer)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        self._reload(serializer)
+
+    def _reload(self, serializer):
+        # The response lists every participant with its character or monster; reading the saved
+        # encounter back through the prefetching queryset keeps that at a fixed number of queries
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+
+class ParticipantBroadcastMixin:
+    """Pushes single-participant writes to the encounter's WebSocket watchers."""
+    participant_kind = None
 
+    def perform_create(self, serializer):
+        participant = serializer.save()
+        broadcast_participants(participant.encounter_id, [participant_row(self.participant_kind, participant)])
+
+    def perform_update(self, serializer):
+        participant = serializer.save()
+        broadcast_participants(participant.encounter_id, [participant_row(self.participant_kind, participant)])
+
+    def perform_destroy(self, instance):
+        encounter_id, participant_id = instance.encounter_id, instance.id
+        instance.delete()
+        broadcast_participants(encounter_id, removed=[{'kind': self.participant_kind, 'id': participant_id}])
 
-class PlayerEncounterDataViewSet(viewsets.ModelViewSet):
+
+class PlayerEncounterDataViewSet(ParticipantBroadcastMixin, viewsets.ModelViewSet):
+    participant_kind = 'player'
     queryset = PlayerEncounterData.objects.all()
     serializer_class = PlayerEncounterDataSerializer
     permission_classes = [IsAuthenticated]
@@ -33,10 +383,11 @@ class PlayerEncounterDataViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(encounter__user=self.request.user)
 
 
-class MonsterEncounterDataViewSet(viewsets.ModelViewSet):
+class MonsterEncounterDataViewSet(ParticipantBroadcastMixin, viewsets.ModelViewSet):
+    participant_kind = 'monster'
     queryset = MonsterEncounterData.objects.all()
     serializer_class = MonsterEncounterDataSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return self.queryset.filter(encounter__user=self.request.user)
\ No newline at end of file
+        return self.queryset.filter(encounter__user=self.request.user)
@@ -0,0 +1,28 @@
+import os
+from pathlib import Path
+
+from prometheus_client import multiprocess
+
+# Loaded with --config by the Dockerfile command, which still sets the bind address and
+# worker class; WEB_CONCURRENCY sets the number of workers
+
+
+def on_starting(server):
+    """
+    Empty PROMETHEUS_MULTIPROC_DIR before the first worker starts. Files left by
+    the workers of a previous run would otherwise be merged into /api/metrics/.
+    """
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    # The directory itself may be a mounted volume, so only its files are removed
+    for path in directory.glob('*.db'):
+        path.unlink(missing_ok=True)
+
+
+def child_exit(server, worker):
+    """Let the live gauges of a worker that exited or was replaced drop out of the totals."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
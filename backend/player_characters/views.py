@@ -1,8 +1,10 @@
 from rest_framework import viewsets, permissions
+
+from config.mixins import ValuesListMixin
 from .models import PlayerCharacter
 from .serializers import PlayerCharacterSerializer
 
-class PlayerCharacterViewSet(viewsets.ModelViewSet):
+class PlayerCharacterViewSet(ValuesListMixin, viewsets.ModelViewSet):
     queryset = PlayerCharacter.objects.all()
     serializer_class = PlayerCharacterSerializer
     permission_classes = [permissions.IsAuthenticated]  
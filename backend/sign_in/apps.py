@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SignInConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "sign_in"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """
+    A size-bounded, thread-safe LRU of resolved users whose entries expire after
+    ``ttl`` seconds. It lives in process memory, so every worker keeps its own.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Requests run in parallel threads, so each gets its own instance
+        return copy.copy(user)
+
+    def set(self, key, user):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        """Drop every cached entry of ``user_id``, whatever token version it was stored under."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_TTL, settings.AUTH_USER_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers resolved users for AUTH_USER_CACHE_TTL seconds.
+
+    Entries are keyed by user id and the token's revoke claim (a digest of the
+    password hash), so tokens issued before a password change never share an
+    entry with newer ones. Saving or deleting a user evicts its entries in this
+    process; other workers drop them when the TTL runs out.
+
+    With AUTH_STATELESS_READS enabled, GET, HEAD and OPTIONS requests skip the
+    lookup entirely and trust the validated claims: the user is an unsaved
+    instance carrying only its id, and a password change or deactivation only
+    takes effect for reads once the access token expires.
+    """
+
+    def authenticate(self, request):
+        self.stateless = settings.AUTH_STATELESS_READS and request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views; only a cache miss leaves the event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        self.stateless = settings.AUTH_STATELESS_READS and request.method in SAFE_METHODS
+        user, key = self.get_cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(super().get_user)(validated_token)
+            user_cache.set(key, user)
+        return user, validated_token
+
+    def get_user(self, validated_token):
+        user, key = self.get_cached_user(validated_token)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return user
+
+    def get_cached_user(self, validated_token):
+        """Return the user if it can be resolved without a query, else None, and its cache key."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken("Token contained no recognizable user identification") from e
+
+        key = (str(user_id), validated_token.get(api_settings.REVOKE_TOKEN_CLAIM))
+        if getattr(self, 'stateless', False):
+            # The claim is serialized as a string; convert it so ids compare equal to stored ones
+            id_field = self.user_model._meta.get_field(api_settings.USER_ID_FIELD)
+            user = self.user_model(**{api_settings.USER_ID_FIELD: id_field.to_python(user_id)})
+            user._state.adding = False
+            return user, key
+        return user_cache.get(key), key
@@ -0,0 +1,15 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_id = str(instance.pk)
+    user_cache.evict(user_id)
+    # A request that read the old row while the transaction was open may have cached it again
+    transaction.on_commit(lambda: user_cache.evict(user_id))
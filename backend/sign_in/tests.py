@@ -0,0 +1,102 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication, UserCache, user_cache
+
+
+class UserCacheTests(SimpleTestCase):
+    def test_entries_expire_after_the_ttl(self):
+        cache = UserCache(ttl=30, max_size=10)
+        with mock.patch('sign_in.authentication.time.monotonic', return_value=100):
+            cache.set(('1', 'revoke'), User(id=1))
+        with mock.patch('sign_in.authentication.time.monotonic', return_value=129):
+            self.assertEqual(cache.get(('1', 'revoke')).id, 1)
+        with mock.patch('sign_in.authentication.time.monotonic', return_value=131):
+            self.assertIsNone(cache.get(('1', 'revoke')))
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = UserCache(ttl=30, max_size=2)
+        cache.set(('1', None), User(id=1))
+        cache.set(('2', None), User(id=2))
+        cache.get(('1', None))
+        cache.set(('3', None), User(id=3))
+        self.assertIsNone(cache.get(('2', None)))
+        self.assertIsNotNone(cache.get(('1', None)))
+
+    def test_evict_drops_every_revoke_claim_of_the_user(self):
+        cache = UserCache(ttl=30, max_size=10)
+        cache.set(('1', 'old'), User(id=1))
+        cache.set(('1', 'new'), User(id=1))
+        cache.set(('2', 'old'), User(id=2))
+        cache.evict('1')
+        self.assertIsNone(cache.get(('1', 'old')))
+        self.assertIsNone(cache.get(('1', 'new')))
+        self.assertIsNotNone(cache.get(('2', 'old')))
+
+    def test_zero_ttl_disables_the_cache(self):
+        cache = UserCache(ttl=0, max_size=10)
+        cache.set(('1', None), User(id=1))
+        self.assertIsNone(cache.get(('1', None)))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user('dm', password='dm-password')
+        self.token = AccessToken.for_user(self.user)
+
+    def request(self, method='get', token=None):
+        token = token or self.token
+        return getattr(APIRequestFactory(), method)('/api/encounters/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def authenticate(self, method='get', token=None):
+        user, _ = CachedJWTAuthentication().authenticate(self.request(method, token))
+        return user
+
+    def test_users_are_cached_under_their_revoke_claim(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(), self.user)
+        key = (str(self.user.id), self.token[api_settings.REVOKE_TOKEN_CLAIM])
+        self.assertEqual(user_cache.get(key), self.user)
+
+    def test_async_reads_share_the_cache(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user, _ = async_to_sync(CachedJWTAuthentication().aauthenticate)(self.request())
+        self.assertEqual(user, self.user)
+
+    def test_password_change_revokes_cached_tokens(self):
+        self.authenticate()
+        self.user.set_password('new-password')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(self.authenticate(token=AccessToken.for_user(self.user)), self.user)
+
+    def test_deactivation_evicts_the_cached_user(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(AUTH_STATELESS_READS=True)
+    def test_stateless_reads_never_load_the_user(self):
+        for method in ('get', 'head', 'options'):
+            with self.subTest(method=method), self.assertNumQueries(0):
+                user = self.authenticate(method)
+            self.assertEqual(user.id, self.user.id)
+            self.assertEqual(user.username, '')
+        # Writes still load, and check, the stored user
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate('post').username, 'dm')
@@ -0,0 +1,33 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .authentication import CachedJWTAuthentication
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware:
+    """
+    Sets ``scope['user']`` for WebSocket connections from an access token.
+
+    Browsers cannot send an Authorization header when opening a socket, so the
+    token is read from the ``token`` query parameter instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        tokens = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        scope = dict(scope, user=await get_user_for_token(tokens[0]) if tokens else AnonymousUser())
+        return await self.app(scope, receive, send)
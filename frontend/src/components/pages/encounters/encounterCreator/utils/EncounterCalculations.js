@@ -45,7 +45,7 @@ export const calculatePartyXpThresholds = (selectedPlayers) => {
 
 export const calculateMonsterXp = (selectedMonsters) => {
     return selectedMonsters.reduce((sum, monster) => {
-        const xpValue = crToXp[monster.cr];
+        const xpValue = monster.xp ?? crToXp[monster.cr];
         return sum + (xpValue || 0);
     }, 0);
 };
\ No newline at end of file
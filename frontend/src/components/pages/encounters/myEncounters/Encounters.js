@@ -8,21 +8,16 @@ import {
   CardHeader,
   CardTitle,
 } from "../../../ui/card";
+import { Button } from "../../../ui/button";
 import { useDarkMode } from "../../../../context/DarkModeContext";
 
 // Reusable component for a single encounter card.
 function EncounterCard({ encounter, onCardClick, darkMode }) {
-  const playerNames = encounter.player_data
-    .slice(0, 3)
-    .map((p) => (p.player_character ? p.player_character.character_name : p.name));
-  const playerNamesString = playerNames.join(", ");
-  const playerCount = encounter.player_data.length;
-
-  const monsterNames = encounter.monster_data
-    .slice(0, 3)
-    .map((m) => (m.monster ? m.monster.name : m.name));
-  const monsterNamesString = monsterNames.join(", ");
-  const monsterCount = encounter.monster_data.length;
+  const playerNamesString = encounter.player_names.join(", ");
+  const playerCount = encounter.player_count;
+
+  const monsterNamesString = encounter.monster_names.join(", ");
+  const monsterCount = encounter.monster_count;
 
   const cardClass = darkMode
     ? "bg-gray-800 border-green-700 hover:scale-105 transition-transform duration-200 cursor-pointer shadow-md"
@@ -72,6 +67,7 @@ function AddEncounterCard({ onCardClick, darkMode }) {
 // Main component to display all encounters
 export default function Encounters() {
   const [encounters, setEncounters] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const navigate = useNavigate();
@@ -83,7 +79,8 @@ export default function Encounters() {
     try {
       setLoading(true);
       const response = await API.get("encounters/my_encounters/");
-      setEncounters(response.data);
+      setEncounters(response.data.results);
+      setNextPage(response.data.next);
     } catch (err) {
       setError(err.response?.data?.detail || err.message);
     } finally {
@@ -91,6 +88,16 @@ export default function Encounters() {
     }
   }
 
+  async function fetchMoreEncounters() {
+    try {
+      const response = await API.get(nextPage);
+      setEncounters((previous) => [...previous, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      setError(err.response?.data?.detail || err.message);
+    }
+  }
+
   useEffect(() => {
     if (!token) {
       setError("No authentication token found. Please log in.");
@@ -125,6 +132,18 @@ export default function Encounters() {
         ))}
         <AddEncounterCard onCardClick={handleNewEncounterClick} darkMode={darkMode} />
       </div>
+      {nextPage && (
+        <Button
+          onClick={fetchMoreEncounters}
+          className={`mt-6 ${
+            darkMode
+              ? "bg-green-900 hover:bg-green-800 text-white"
+              : "bg-green-700 hover:bg-green-600 text-white"
+          }`}
+        >
+          Load more
+        </Button>
+      )}
     </div>
   );
 }
\ No newline at end of file